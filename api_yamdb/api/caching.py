@@ -0,0 +1,77 @@
+import hashlib
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+VERSION_KEY = 'version:{}'
+
+
+def is_shared():
+    """Кэш виден всем процессам приложения.
+
+    Версии и ответы в кэше одного процесса не сбрасываются записью через
+    другой воркер, поэтому с таким кэшем ответы не кэшируются.
+    """
+    return not isinstance(caches['default'], PROCESS_LOCAL_BACKENDS)
+
+
+def get_versions(*resources):
+    """Текущие версии ресурсов; меняются при каждой записи в ресурс.
+
+    Версия - время последнего изменения в наносекундах, поэтому после
+    вытеснения ключа она не совпадёт ни с одной из выданных ранее и
+    годится для заголовка Last-Modified.
+    """
+    keys = [VERSION_KEY.format(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_version(resource):
+    return get_versions(resource)[0]
+
+
+def bump_version(resource):
+    key = VERSION_KEY.format(resource)
+    cache.set(key, max(time.time_ns(), cache.get(key, 0) + 1), None)
+
+
+def last_modified(versions):
+    """Время последнего изменения ресурсов, секунды."""
+    return max(versions) // 10 ** 9
+
+
+def request_digest(request, view):
+    """Хэш действия, адреса и нормализованных параметров запроса."""
+    params = '&'.join(
+        f'{name}={value}'
+        for name in sorted(request.query_params)
+        for value in sorted(request.query_params.getlist(name))
+    )
+    url = request.build_absolute_uri(request.path)
+    return hashlib.md5(
+        f'{view.action}:{url}?{params}'.encode()
+    ).hexdigest()
+
+
+def response_key(resource, request, view):
+    return (
+        f'response:{resource}:{get_version(resource)}:'
+        f'{request_digest(request, view)}'
+    )
+
+
+def etag(versions, request, view):
+    """Сильный ETag из версий ресурсов, запроса и формата ответа."""
+    return '"{}"'.format(hashlib.md5(':'.join((
+        *map(str, versions),
+        request_digest(request, view),
+        str(request.accepted_media_type),
+    )).encode()).hexdigest())
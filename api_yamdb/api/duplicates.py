@@ -0,0 +1,119 @@
+"""Поиск повторяющихся SQL-запросов (N+1) в рамках одного запроса.
+
+Включается настройкой DUPLICATE_QUERY_MODE для разработки и стенда:
+'log' пишет предупреждения в лог, 'header' добавляет заголовок
+X-Duplicate-Queries, 'raise' превращает ответ в ошибку.
+"""
+import logging
+import re
+import sys
+import sysconfig
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Модули библиотек и инструментирующие модули API не считаются местом,
+# откуда был вызван запрос.
+LIBRARY_PATHS = tuple(
+    str(Path(sysconfig.get_paths()[name]).resolve())
+    for name in ('stdlib', 'purelib', 'platlib')
+)
+INSTRUMENTATION_FILES = tuple(
+    str(Path(__file__).resolve().with_name(name))
+    for name in ('duplicates.py', 'metrics.py', 'timing.py')
+)
+
+
+def statement_shape(sql):
+    """Текст запроса без литералов и с одинаковыми списками IN (...)."""
+    sql = re.sub(r"'[^']*'|\b\d+\b", '?', sql)
+    return re.sub(r'IN \((?:%s|\?)(?:, (?:%s|\?))*\)', 'IN (...)', sql)
+
+
+@lru_cache(maxsize=None)
+def is_project_file(filename):
+    return not str(Path(filename).resolve()).startswith(
+        LIBRARY_PATHS + INSTRUMENTATION_FILES
+    )
+
+
+def caller_location():
+    """Ближайший к запросу кадр стека из кода проекта: ``файл:строка``."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        if is_project_file(frame.f_code.co_filename):
+            return f'{frame.f_code.co_filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class DuplicateQueriesError(Exception):
+    pass
+
+
+class QueryRecorder:
+
+    def __init__(self):
+        self.shapes = Counter()
+        self.locations = defaultdict(Counter)
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = statement_shape(sql)
+        self.shapes[shape] += 1
+        self.locations[shape][caller_location()] += 1
+        return execute(sql, params, many, context)
+
+    def duplicates(self, threshold):
+        """Повторы вида запроса и место, откуда он вызывался чаще всего."""
+        return [
+            (amount, shape, self.locations[shape].most_common(1)[0][0])
+            for shape, amount in self.shapes.most_common()
+            if amount >= threshold
+        ]
+
+
+class DuplicateQueryMiddleware:
+    """Группирует SQL-запросы по виду и сообщает о повторах.
+
+    Запрос считается повторяющимся, если его вид встретился не меньше
+    DUPLICATE_QUERY_THRESHOLD раз за один HTTP-запрос.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.DUPLICATE_QUERY_MODE
+        if not mode:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duplicates = recorder.duplicates(settings.DUPLICATE_QUERY_THRESHOLD)
+        if not duplicates:
+            return response
+        if mode == 'header':
+            response['X-Duplicate-Queries'] = ', '.join(
+                f'{amount}x {location}' for amount, _, location in duplicates
+            )
+            return response
+        report = '\n'.join(
+            f'{amount} раз(а) из {location}: {shape}'
+            for amount, shape, location in duplicates
+        )
+        message = (
+            f'{request.method} {request.path}: повторяющиеся '
+            f'SQL-запросы\n{report}'
+        )
+        if mode == 'raise':
+            raise DuplicateQueriesError(message)
+        logger.warning(message)
+        return response
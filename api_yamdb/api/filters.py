@@ -1,12 +1,80 @@
+from django.db.models import Exists, OuterRef
 from rest_framework import filters
 
+from reviews.models import Category, Genre, Title
+from reviews.search import search_titles
+
 
 class GenreCategoryFilter(filters.BaseFilterBackend):
+    """Фильтр произведений по слагам категории и жанров.
+
+    Слаги один раз переводятся в id, после чего фильтрация идёт по
+    ``category_id`` и подзапросу EXISTS к таблице связи жанров, без JOIN.
+    ``genre=drama,comedy`` отбирает произведения хотя бы с одним из жанров,
+    а с ``genre_mode=all`` - только со всеми перечисленными жанрами.
+    """
+
+    genre_param = 'genre'
+    genre_mode_param = 'genre_mode'
+    category_param = 'category'
+
+    @staticmethod
+    def resolve_slugs(model, slugs):
+        return dict(
+            model.objects.filter(slug__in=slugs).values_list('slug', 'id')
+        )
+
+    @staticmethod
+    def has_genre(genre_ids):
+        return Exists(
+            Title.genre.through.objects.filter(
+                title_id=OuterRef('pk'), genre_id__in=genre_ids
+            )
+        )
+
     def filter_queryset(self, request, queryset, view):
-        genre_slug = request.query_params.get('genre')
-        if genre_slug:
-            queryset = queryset.filter(genre__slug=genre_slug)
-        category_slug = request.query_params.get('category')
+        genre_slugs = {
+            slug for slug in
+            request.query_params.get(self.genre_param, '').split(',')
+            if slug
+        }
+        if genre_slugs:
+            genre_ids = self.resolve_slugs(Genre, genre_slugs)
+            if request.query_params.get(self.genre_mode_param) == 'all':
+                if len(genre_ids) < len(genre_slugs):
+                    return queryset.none()
+                for genre_id in genre_ids.values():
+                    queryset = queryset.filter(self.has_genre((genre_id,)))
+            elif not genre_ids:
+                return queryset.none()
+            else:
+                queryset = queryset.filter(
+                    self.has_genre(list(genre_ids.values()))
+                )
+        category_slug = request.query_params.get(self.category_param)
         if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
+            category_ids = self.resolve_slugs(Category, (category_slug,))
+            if not category_ids:
+                return queryset.none()
+            queryset = queryset.filter(
+                category_id=category_ids[category_slug]
+            )
         return queryset
+
+
+class TitleSearchFilter(filters.BaseFilterBackend):
+    """Полнотекстовый поиск по названию и описанию произведения.
+
+    Без явного ``ordering`` результаты сортируются по релевантности.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param)
+        if not text:
+            return queryset
+        queryset = search_titles(queryset, text)
+        if filters.OrderingFilter.ordering_param in request.query_params:
+            return queryset
+        return queryset.order_by('rank', 'id')
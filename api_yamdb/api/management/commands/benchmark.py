@@ -0,0 +1,249 @@
+import json
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.management.stats import percentile
+from reviews.models import Comment, Review, Title, User
+
+BASELINE_PATH = settings.BASE_DIR / 'benchmark_baseline.json'
+LOCMEM_EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+FILE_CACHE_BACKEND = 'django.core.cache.backends.filebased.FileBasedCache'
+CONFIRMATION_CODE = '123456'
+
+# Имя замера, метод, адрес, кто отправляет запрос, тело запроса.
+BENCHMARKS = (
+    ('titles list', 'get', '/api/v1/titles/', 'anon', None),
+    ('titles list by genre', 'get', '/api/v1/titles/?genre={genre}',
+     'anon', None),
+    ('titles list by genres', 'get',
+     '/api/v1/titles/?genre={genre},{other_genre}&genre_mode=all',
+     'anon', None),
+    ('titles list by category', 'get',
+     '/api/v1/titles/?category={category}', 'anon', None),
+    ('titles list by year', 'get', '/api/v1/titles/?year={year}',
+     'anon', None),
+    ('titles list by name', 'get', '/api/v1/titles/?name={name}',
+     'anon', None),
+    ('titles search', 'get', '/api/v1/titles/?search={word}', 'anon', None),
+    ('titles deep page', 'get', '/api/v1/titles/?page={last_page}',
+     'anon', None),
+    ('titles cursor', 'get', '/api/v1/titles/?cursor=', 'anon', None),
+    ('title detail', 'get', '/api/v1/titles/{title_id}/', 'anon', None),
+    ('categories list', 'get', '/api/v1/categories/', 'anon', None),
+    ('genres list', 'get', '/api/v1/genres/', 'anon', None),
+    ('reviews list', 'get', '/api/v1/titles/{title_id}/reviews/',
+     'anon', None),
+    ('review detail', 'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/', 'anon', None),
+    ('comments list', 'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+     'anon', None),
+    ('comment detail', 'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     'anon', None),
+    ('comment create', 'post',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+     'user', {'text': 'benchmark'}),
+    ('users list', 'get', '/api/v1/users/', 'admin', None),
+    ('user detail', 'get', '/api/v1/users/{username}/', 'admin', None),
+    ('users me', 'get', '/api/v1/users/me/', 'user', None),
+    ('auth signup', 'post', '/api/v1/auth/signup/', 'anon',
+     {'username': '{username}', 'email': '{email}'}),
+    ('auth token', 'post', '/api/v1/auth/token/', 'anon',
+     {'username': '{username}', 'confirmation_code': CONFIRMATION_CODE}),
+)
+
+
+def fill(template, context):
+    """Подставляет значения из context в строки адреса или тела запроса."""
+    if isinstance(template, dict):
+        return {key: fill(value, context) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(value, context) for value in template]
+    if isinstance(template, str):
+        return template.format(**context)
+    return template
+
+
+class Command(BaseCommand):
+    """Замеры всех эндпоинтов API на сгенерированных данных.
+
+    Данные создаются командой generate_data во временной тестовой БД.
+    Для каждого эндпоинта сохраняются перцентили времени ответа и число
+    SQL-запросов; при сравнении с базовой линией команда завершается
+    ошибкой, если время выросло больше порога или запросов стало больше.
+    """
+
+    help = 'Замеряет время ответа и число запросов для эндпоинтов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help='Допустимый рост p50, доля от базовой линии.',
+        )
+        parser.add_argument('--baseline', default=str(BASELINE_PATH))
+        parser.add_argument(
+            '--save', action='store_true',
+            help='Сохранить результаты как новую базовую линию.',
+        )
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Не очищать кэш ответов перед каждым запросом.',
+        )
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # Письма регистрации не должны попадать в sent_emails, а очистка
+        # кэша перед запросами - задевать кэш работающего сервера. Кэш
+        # файловый, как по умолчанию: с локальным для процесса кэшем
+        # ответы не кэшируются.
+        try:
+            with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+                EMAIL_BACKEND=LOCMEM_EMAIL_BACKEND,
+                CACHES={'default': {
+                    'BACKEND': FILE_CACHE_BACKEND, 'LOCATION': cache_dir,
+                }},
+            ):
+                call_command(
+                    'generate_data', stdout=self.stdout,
+                    **{name: options[name] for name in (
+                        'titles', 'users', 'reviews', 'comments', 'seed'
+                    )},
+                )
+                results = self.run_benchmarks(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.report(results, options)
+
+    def build_context(self):
+        title = Title.objects.annotate(
+            amount=Count('reviews')
+        ).order_by('-amount', 'pk').first()
+        review = Review.objects.filter(title=title).annotate(
+            amount=Count('comments')
+        ).order_by('-amount', 'pk').first()
+        genres = list(title.genre.order_by('pk')[:2])
+        if len(genres) < 2:
+            genres *= 2
+        user = User.objects.filter(role=User.RoleChoice.user).first()
+        return dict(
+            title_id=title.pk,
+            review_id=review.pk,
+            comment_id=Comment.objects.filter(review=review).first().pk,
+            genre=genres[0].slug,
+            other_genre=genres[1].slug,
+            category=title.category.slug,
+            year=title.year,
+            name=title.name,
+            word=title.name.split()[0],
+            last_page=(
+                Title.objects.count() - 1
+            ) // settings.REST_FRAMEWORK['PAGE_SIZE'] + 1,
+            username=user.username,
+            email=user.email,
+        )
+
+    def build_clients(self):
+        admin = User.objects.create_user(
+            username='benchmark-admin', email='benchmark-admin@yamdb.fake',
+            role=User.RoleChoice.admin,
+        )
+        user = User.objects.filter(role=User.RoleChoice.user).first()
+        clients = dict(anon=APIClient())
+        for role, account in (('admin', admin), ('user', user)):
+            clients[role] = APIClient()
+            clients[role].credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(account)}'
+            )
+        return clients
+
+    def run_benchmarks(self, options):
+        context = self.build_context()
+        clients = self.build_clients()
+        results = {}
+        for name, method, url, role, data in BENCHMARKS:
+            url, data = fill(url, context), fill(data, context)
+            timings, queries, status = [], [], None
+            for attempt in range(options['warmup'] + options['repeat']):
+                if not options['cached']:
+                    cache.clear()
+                if name == 'auth token':
+                    User.objects.filter(username=context['username']).update(
+                        confirmation_code=CONFIRMATION_CODE
+                    )
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = getattr(clients[role], method)(url, data)
+                    elapsed = time.perf_counter() - started
+                status = response.status_code
+                if attempt >= options['warmup']:
+                    timings.append(elapsed * 1000)
+                    queries.append(len(captured))
+            results[name] = dict(
+                status=status,
+                queries=max(queries),
+                p50=statistics.median(timings),
+                p95=percentile(timings, 0.95),
+                p99=percentile(timings, 0.99),
+            )
+        return results
+
+    def report(self, results, options):
+        try:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            baseline = {}
+        regressions = []
+        self.stdout.write(
+            f'{"эндпоинт":<26}{"код":>5}{"SQL":>5}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"база p50":>10}'
+        )
+        for name, result in results.items():
+            base = baseline.get(name)
+            self.stdout.write(
+                f'{name:<26}{result["status"]:>5}{result["queries"]:>5}'
+                f'{result["p50"]:>10.2f}{result["p95"]:>10.2f}'
+                f'{result["p99"]:>10.2f}'
+                + (f'{base["p50"]:>10.2f}' if base else f'{"-":>10}')
+            )
+            if not base:
+                continue
+            if result['p50'] > base['p50'] * (1 + options['threshold']):
+                regressions.append(
+                    f'{name}: p50 {result["p50"]:.2f} мс против '
+                    f'{base["p50"]:.2f} мс'
+                )
+            if result['queries'] > base['queries']:
+                regressions.append(
+                    f'{name}: {result["queries"]} SQL-запросов против '
+                    f'{base["queries"]}'
+                )
+        if options['save']:
+            with open(options['baseline'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f'Базовая линия: {options["baseline"]}')
+            )
+        if regressions:
+            raise CommandError(
+                'Регрессия производительности:\n' + '\n'.join(regressions)
+            )
@@ -0,0 +1,186 @@
+import random
+import threading
+import time
+from itertools import count
+
+import requests
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from api.management.postman import (
+    Stats, is_error, load_collection, scenario_name, send
+)
+from reviews.models import User
+
+COLLECTION_PATH = (
+    settings.BASE_DIR.parent / 'postman_collection'
+    / 'Ymdb-collection.postman_collection.json'
+)
+# Вес сценария по умолчанию: преобладает чтение каталога, создание
+# записей по умолчанию не повторяется (уникальные slug и отзывы).
+DEFAULT_WEIGHTS = {
+    'titles/get_titles_info': 10,
+    'reviews/get_reviews': 6,
+    'comments/get_comments': 4,
+    'reviews/title_rating': 2,
+    'users/get_user_info': 1,
+    'users/users/me': 1,
+    'reviews/update_reviews': 1,
+    'comments/update_comments': 1,
+}
+# Папки, которые подготовка пропускает: удаление сломало бы сценарии.
+DEFAULT_SETUP_SKIP = ('delete_requests',)
+
+
+def parse_weight(value):
+    name, _, weight = value.rpartition('=')
+    try:
+        return name, float(weight)
+    except ValueError:
+        raise CommandError(f'Вес сценария задаётся как ИМЯ=ЧИСЛО: {value}')
+
+
+class Command(BaseCommand):
+    """Нагрузочный прогон по Postman-коллекции.
+
+    Сначала коллекция выполняется один раз по порядку, как в Postman,
+    чтобы создать данные и получить токены и id. Затем потоки повторяют
+    случайные сценарии (папки второго уровня) с заданными весами.
+    Перед запуском подготовьте БД скриптом postman_collection/set_up_data.sh
+    и запустите сервер; коды подтверждения команда читает из той же БД.
+    """
+
+    help = 'Воспроизводит нагрузку по Postman-коллекции.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--collection', default=str(COLLECTION_PATH))
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность нагрузки, секунды.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=None,
+            help='Остановиться после этого числа запросов.',
+        )
+        parser.add_argument(
+            '--weight', type=parse_weight, action='append', default=None,
+            help='Вес сценария, например titles/get_titles_info=10; '
+                 '0 исключает сценарий.',
+        )
+        parser.add_argument(
+            '--setup-skip', action='append', default=None,
+            help='Папки верхнего уровня, не выполняемые при подготовке '
+                 f'(по умолчанию {", ".join(DEFAULT_SETUP_SKIP)}).',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        items, variables = load_collection(options['collection'])
+        weights = {**DEFAULT_WEIGHTS, **dict(options['weight'] or ())}
+        if options['setup_skip'] is None:
+            options['setup_skip'] = DEFAULT_SETUP_SKIP
+        scenarios = {}
+        for item in items:
+            if weights.get(scenario_name(item), 0) > 0:
+                scenarios.setdefault(scenario_name(item), []).append(item)
+        if not scenarios:
+            raise CommandError('Нет сценариев с положительным весом.')
+
+        self.setup(items, variables, options)
+
+        results = []
+        budget = count()
+        started = time.perf_counter()
+        deadline = started + options['duration']
+        workers = [
+            threading.Thread(target=self.work, args=(
+                scenarios, weights, dict(variables), results, budget,
+                deadline, random.Random(
+                    None if options['seed'] is None
+                    else options['seed'] + index
+                ), options,
+            ))
+            for index in range(options['concurrency'])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stats = Stats()
+        for worker_stats in results:
+            stats.merge(worker_stats)
+        self.report(stats, time.perf_counter() - started)
+
+    def setup(self, items, variables, options):
+        session = requests.Session()
+        failed = 0
+        for item in items:
+            if item['folders'][0] in options['setup_skip']:
+                continue
+            status, _ = send(session, options['url'], item, variables)
+            if is_error(item, status):
+                failed += 1
+                self.stderr.write(
+                    f'подготовка: {item["name"]} - статус {status}, '
+                    f'ожидался {item["expected"]}'
+                )
+            if item['url'].rstrip('/').endswith('auth/signup'):
+                self.store_confirmation_code(item, variables)
+        self.stdout.write(
+            f'подготовка: {len(items)} запросов в коллекции, '
+            f'неожиданных ответов {failed}'
+        )
+
+    def store_confirmation_code(self, item, variables):
+        """Код из письма берётся из БД: xUsername -> xConfirmationCode."""
+        for variable in item['captures']:
+            if not variable.endswith('Username'):
+                continue
+            prefix = variable[:-len('Username')]
+            code = User.objects.filter(
+                username=variables.get(variable)
+            ).values_list('confirmation_code', flat=True).first()
+            if code:
+                variables[f'{prefix}ConfirmationCode'] = code
+
+    def work(self, scenarios, weights, variables, results, budget, deadline,
+             rng, options):
+        session = requests.Session()
+        names = list(scenarios)
+        scenario_weights = [weights[name] for name in names]
+        stats = Stats()
+        results.append(stats)
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(names, scenario_weights)[0]
+            for item in scenarios[scenario]:
+                if (
+                    options['requests'] is not None
+                    and next(budget) >= options['requests']
+                ) or time.perf_counter() >= deadline:
+                    return
+                status, seconds = send(
+                    session, options['url'], item, variables
+                )
+                stats.add(item['name'], seconds, is_error(item, status))
+
+    def report(self, stats, elapsed):
+        self.stdout.write(
+            f'{"запрос":<60}{"всего":>7}{"в с":>8}{"ошибки":>8}'
+            f'{"p50, мс":>9}{"p95, мс":>9}{"p99, мс":>9}'
+        )
+        total = errors = 0
+        for row in stats.rows(elapsed):
+            total += row['requests']
+            errors += row['errors'] * row['requests']
+            self.stdout.write(
+                f'{row["name"][:59]:<60}{row["requests"]:>7}'
+                f'{row["rps"]:>8.1f}{row["errors"]:>8.1%}'
+                f'{row["p50"]:>9.1f}{row["p95"]:>9.1f}{row["p99"]:>9.1f}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'всего {total} запросов за {elapsed:.1f} с '
+            f'({total / elapsed:.1f} в с), ошибок '
+            f'{errors / max(total, 1):.1%}'
+        ))
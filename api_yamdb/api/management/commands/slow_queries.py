@@ -0,0 +1,71 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+ORDERINGS = {
+    'total': lambda group: sum(group['durations']),
+    'max': lambda group: max(group['durations']),
+    'count': lambda group: len(group['durations']),
+}
+
+
+def read_log(path):
+    """Записи журнала медленных запросов; посторонние строки пропускаются."""
+    with open(path, encoding='utf-8') as log:
+        for line in log:
+            try:
+                record = json.loads(line[line.index('{'):])
+            except ValueError:
+                continue
+            if 'shape' in record and 'duration_ms' in record:
+                yield record
+
+
+class Command(BaseCommand):
+    """Сводка журнала медленных SQL-запросов по видам запросов."""
+
+    help = 'Показывает самые медленные виды SQL-запросов из журнала.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=str(settings.SLOW_QUERY_LOG))
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--order', choices=ORDERINGS, default='total',
+            help='Сортировка: суммарное время, максимум или число запросов.',
+        )
+
+    def handle(self, *args, **options):
+        groups = defaultdict(lambda: dict(durations=[], views=set()))
+        try:
+            for record in read_log(options['log']):
+                group = groups[record['shape']]
+                group['durations'].append(record['duration_ms'])
+                group['views'].add(record.get('view'))
+                if record['duration_ms'] >= max(group['durations']):
+                    group['slowest'] = record
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {options["log"]} не найден.')
+        if not groups:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        ordered = sorted(
+            groups.values(), key=ORDERINGS[options['order']], reverse=True
+        )
+        for group in ordered[:options['limit']]:
+            durations = group['durations']
+            slowest = group['slowest']
+            self.stdout.write(self.style.WARNING(
+                f'{len(durations)} раз(а), всего {sum(durations):.1f} мс, '
+                f'в среднем {sum(durations) / len(durations):.1f} мс, '
+                f'максимум {max(durations):.1f} мс'
+            ))
+            self.stdout.write(
+                'действия: ' + ', '.join(sorted(map(str, group['views'])))
+            )
+            self.stdout.write(f'запрос: {slowest["sql"]}')
+            self.stdout.write(f'параметры: {slowest["params"]}')
+            for line in slowest.get('plan') or ():
+                self.stdout.write(f'  {line}')
+            self.stdout.write('')
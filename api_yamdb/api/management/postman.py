@@ -0,0 +1,172 @@
+"""Запросы Postman-коллекции для нагрузочного прогона.
+
+Из скриптов тестов коллекции берутся ожидаемый статус ответа и правила
+сохранения переменных (``pm.collectionVariables.set``), поэтому запросы
+можно выполнять цепочкой без Postman. Модуль не обращается к Django.
+"""
+import json
+import re
+import time
+from collections import defaultdict
+from http import HTTPStatus
+
+import requests
+
+from .stats import percentile
+
+VARIABLE = re.compile(r'\{\{(\w+)\}\}')
+EXPECTED_STATUS = re.compile(
+    r'pm\.response\.status,.*?\)\.to\.be\.eql\("([^"]+)"\)', re.DOTALL
+)
+RESPONSE_FIELD = re.compile(
+    r'const (\w+) = [^;]*_\.get\(responseData, ["\'](\w+)["\']\)'
+)
+SET_VARIABLE = re.compile(r'collectionVariables\.set\("(\w+)", (\w+)\)')
+STATUS_BY_PHRASE = {status.phrase: status.value for status in HTTPStatus}
+
+
+def substitute(text, variables):
+    return VARIABLE.sub(
+        lambda match: str(variables.get(match[1], match[0])), text
+    )
+
+
+def parse_item(folders, item, inherited_auth=None):
+    """Запрос коллекции: всё, что нужно для его повторения.
+
+    Запрос без собственной авторизации наследует её от папки, как в Postman.
+    """
+    script = '\n'.join(
+        line
+        for event in item.get('event', ())
+        if event['listen'] == 'test'
+        for line in event['script']['exec']
+    )
+    fields = dict(RESPONSE_FIELD.findall(script))
+    request = item['request']
+    url = request['url']
+    auth = request.get('auth') or inherited_auth or {}
+    token = next((
+        entry['value'] for entry in auth.get('bearer', ())
+        if entry['key'] == 'token'
+    ), None) if auth.get('type') == 'bearer' else None
+    expected = EXPECTED_STATUS.search(script)
+    return dict(
+        folders=folders,
+        name=f'{"/".join(folders[1:])}/{item["name"]}',
+        method=request['method'],
+        url=url['raw'] if isinstance(url, dict) else url,
+        body=(request.get('body') or {}).get('raw'),
+        token=token,
+        expected=STATUS_BY_PHRASE.get(expected[1]) if expected else None,
+        captures={
+            variable: fields[local]
+            for variable, local in SET_VARIABLE.findall(script)
+            if local in fields
+        },
+    )
+
+
+def load_collection(path):
+    """Запросы в порядке коллекции и начальные значения переменных."""
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+
+    def walk(items, folders, auth):
+        for item in items:
+            if 'item' in item:
+                yield from walk(
+                    item['item'], folders + (item['name'],),
+                    item.get('auth') or auth,
+                )
+            else:
+                yield parse_item(folders, item, auth)
+
+    variables = {
+        variable['key']: variable.get('value', '')
+        for variable in collection.get('variable', ())
+    }
+    return list(
+        walk(collection['item'], (), collection.get('auth'))
+    ), variables
+
+
+def scenario_name(item):
+    """Сценарий - папка второго уровня: ``titles/get_titles_info``."""
+    return '/'.join(item['folders'][:2])
+
+
+def send(session, base_url, item, variables, timeout=30):
+    """Выполняет запрос и сохраняет переменные из ответа.
+
+    Возвращает статус (None при сетевой ошибке) и длительность, секунды.
+    """
+    url = re.sub(
+        r'^https?://[^/]+', base_url.rstrip('/'),
+        substitute(item['url'], variables),
+    )
+    headers = {}
+    if item['body']:
+        headers['Content-Type'] = 'application/json'
+    if item['token']:
+        headers['Authorization'] = (
+            f'Bearer {substitute(item["token"], variables)}'
+        )
+    body = substitute(item['body'], variables) if item['body'] else None
+    started = time.perf_counter()
+    try:
+        response = session.request(
+            item['method'], url, data=body and body.encode(),
+            headers=headers, timeout=timeout,
+        )
+    except requests.RequestException:
+        return None, time.perf_counter() - started
+    elapsed = time.perf_counter() - started
+    if item['captures'] and response.status_code < 400:
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        for variable, field in item['captures'].items():
+            if isinstance(data, dict) and data.get(field) is not None:
+                variables[variable] = data[field]
+    return response.status_code, elapsed
+
+
+def is_error(item, status):
+    if status is None:
+        return True
+    if item['expected'] is not None:
+        return status != item['expected']
+    return status >= 400
+
+
+class Stats:
+    """Длительности и ошибки по именам запросов."""
+
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, name, seconds, error):
+        self.durations[name].append(seconds)
+        if error:
+            self.errors[name] += 1
+
+    def merge(self, other):
+        for name, durations in other.durations.items():
+            self.durations[name] += durations
+        for name, errors in other.errors.items():
+            self.errors[name] += errors
+
+    def rows(self, elapsed):
+        for name, durations in sorted(self.durations.items()):
+            yield dict(
+                name=name,
+                requests=len(durations),
+                rps=len(durations) / elapsed,
+                errors=self.errors[name] / len(durations),
+                p50=percentile(durations, 0.5) * 1000,
+                p95=percentile(durations, 0.95) * 1000,
+                p99=percentile(durations, 0.99) * 1000,
+            )
@@ -0,0 +1,10 @@
+"""Статистика длительностей для команд замеров.
+
+Модуль не обращается к Django, поэтому годится и для postman.py.
+"""
+
+
+def percentile(values, share):
+    """Значение, ниже которого лежит доля share значений (0 < share <= 1)."""
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
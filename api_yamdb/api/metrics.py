@@ -0,0 +1,383 @@
+"""Метрики запросов в памяти процесса.
+
+Каждый поток пишет в свой набор счётчиков без блокировок; блокировка
+берётся только при появлении нового потока. Наборы завершившихся потоков
+(runserver открывает поток на соединение) складываются в общий. Если задан
+settings.METRICS_DIR, процесс периодически сбрасывает свои метрики в
+файл ``<pid>-<метка запуска>.json`` этой директории, а /metrics суммирует
+файлы всех процессов (воркеров gunicorn). /metrics доступен только с
+токеном settings.METRICS_TOKEN.
+"""
+import fcntl
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+# Верхние границы корзин гистограммы, секунды; последняя корзина - +Inf.
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+COUNTERS = {
+    'requests': 'Число запросов.',
+    'errors': 'Число ответов с кодом 5xx.',
+    'db_queries': 'Число SQL-запросов.',
+    'cache_hits': 'Ответы из кэша.',
+    'cache_misses': 'Ответы, собранные заново.',
+}
+# Сумма метрик завершившихся процессов и блокировка директории метрик.
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = '.lock'
+
+
+class Shard:
+    """Метрики одного потока."""
+
+    def __init__(self):
+        self.counters = defaultdict(lambda: defaultdict(int))
+        # Число попаданий в каждую корзину и сумма длительностей.
+        self.histograms = defaultdict(lambda: [0] * len(BUCKETS) + [0, 0.0])
+
+
+class Registry:
+
+    def __init__(self):
+        self.local = threading.local()
+        # Наборы живых потоков и сумма наборов завершившихся.
+        self.shards = []
+        self.retired = Shard()
+        self.lock = threading.Lock()
+        self.flushed = time.monotonic()
+        self.pid = None
+        self.file_name = None
+
+    def shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = Shard()
+            with self.lock:
+                self.retire_finished()
+                self.shards.append((threading.current_thread(), shard))
+        return shard
+
+    def retire_finished(self):
+        """Складывает наборы завершившихся потоков; вызывается под lock."""
+        alive = []
+        for thread, shard in self.shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                add_shard(self.retired, shard)
+        self.shards = alive
+
+    def observe(self, view, seconds, queries, status, cache=None):
+        shard = self.shard()
+        counters = shard.counters
+        counters['requests'][view] += 1
+        counters['db_queries'][view] += queries
+        if status >= 500:
+            counters['errors'][view] += 1
+        if cache == 'HIT':
+            counters['cache_hits'][view] += 1
+        elif cache == 'MISS':
+            counters['cache_misses'][view] += 1
+        histogram = shard.histograms[view]
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            index = len(BUCKETS)
+        histogram[index] += 1
+        histogram[-1] += seconds
+
+    def snapshot(self):
+        """Сумма метрик всех потоков процесса."""
+        total = Shard()
+        with self.lock:
+            self.retire_finished()
+            add_shard(total, self.retired)
+            shards = [shard for _, shard in self.shards]
+        for shard in shards:
+            add_shard(total, shard)
+        return dict(
+            counters=total.counters, histograms=dict(total.histograms)
+        )
+
+    def own_file(self):
+        """Файл метрик процесса.
+
+        Случайная метка отличает его от файла прежнего процесса с тем же
+        pid; после fork имя выбирается заново.
+        """
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.file_name = f'{self.pid}-{uuid.uuid4().hex}.json'
+        return self.file_name
+
+    def flush(self, directory):
+        """Атомарно записывает метрики процесса в его файл в directory."""
+        self.flushed = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        write_json(directory, self.own_file(), self.snapshot())
+
+    def maybe_flush(self):
+        directory = settings.METRICS_DIR
+        if directory and (
+            time.monotonic() - self.flushed
+            >= settings.METRICS_FLUSH_INTERVAL
+        ):
+            self.flush(directory)
+
+    def collect(self):
+        """Метрики всех процессов, если задан METRICS_DIR, иначе - этого."""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return self.snapshot()
+        self.flush(directory)
+        with locked(directory):
+            retire_stale(directory)
+            return combine(
+                read_json(path) for path in Path(directory).glob('*.json')
+            )
+
+
+def write_json(directory, file_name, data):
+    with tempfile.NamedTemporaryFile(
+        'w', dir=directory, suffix='.tmp', delete=False
+    ) as file:
+        json.dump(data, file)
+    os.replace(file.name, os.path.join(directory, file_name))
+
+
+def read_json(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def locked(directory):
+    """Исключительная блокировка директории метрик между процессами."""
+    with open(os.path.join(directory, LOCK_FILE), 'a') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        yield
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def retire_stale(directory):
+    """Переносит метрики завершившихся процессов в RETIRED_FILE.
+
+    Файлы мёртвых воркеров удаляются, а их счётчики остаются в сумме,
+    поэтому значения /metrics не уменьшаются при перезапуске воркеров.
+    Вызывается под блокировкой директории.
+    """
+    stale = [
+        path for path in Path(directory).glob('*-*.json')
+        if path.name.split('-', 1)[0].isdigit()
+        and not process_alive(int(path.name.split('-', 1)[0]))
+    ]
+    if not stale:
+        return
+    write_json(directory, RETIRED_FILE, combine(
+        read_json(path)
+        for path in (Path(directory) / RETIRED_FILE, *stale)
+    ))
+    for path in stale:
+        path.unlink(missing_ok=True)
+
+
+def combine(snapshots):
+    """Сумма снимков метрик; пропущенные (None) не учитываются."""
+    total = dict(counters=defaultdict(lambda: defaultdict(int)),
+                 histograms={})
+    for snapshot in snapshots:
+        if snapshot is None:
+            continue
+        for name, values in snapshot['counters'].items():
+            for view, value in values.items():
+                total['counters'][name][view] += value
+        for view, histogram in snapshot['histograms'].items():
+            total['histograms'][view] = merge(
+                total['histograms'].get(view), histogram
+            )
+    return total
+
+
+def add_shard(total, shard):
+    """Прибавляет метрики shard к total."""
+    for name, values in shard.counters.copy().items():
+        for view, value in values.copy().items():
+            total.counters[name][view] += value
+    for view, histogram in shard.histograms.copy().items():
+        total.histograms[view] = merge(total.histograms.get(view), histogram)
+
+
+def merge(first, second):
+    if first is None:
+        return list(second)
+    return [left + right for left, right in zip(first, second)]
+
+
+def quantile(histogram, share):
+    """Оценка квантиля по корзинам с линейной интерполяцией внутри корзины.
+
+    Для последней (бесконечной) корзины возвращается её нижняя граница.
+    """
+    counts = histogram[:-1]
+    rank = share * sum(counts)
+    seen = 0
+    for index, amount in enumerate(counts):
+        if amount and seen + amount >= rank:
+            lower = BUCKETS[index - 1] if index else 0.0
+            if index == len(BUCKETS):
+                return lower
+            return lower + (BUCKETS[index] - lower) * (rank - seen) / amount
+        seen += amount
+    return 0.0
+
+
+def view_name(request):
+    """Имя действия: ``TitleViewSet.list``, ``TokenView.post``."""
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    view = getattr(match.func, 'cls', None)
+    if view is None:
+        return getattr(match.func, '__name__', 'unknown')
+    method = request.method.lower()
+    action = getattr(match.func, 'actions', {}).get(method, method)
+    return f'{view.__name__}.{action}'
+
+
+def render(metrics):
+    """Метрики в текстовом формате Prometheus."""
+    lines = []
+    for name, description in COUNTERS.items():
+        lines += [
+            f'# HELP api_{name}_total {description}',
+            f'# TYPE api_{name}_total counter',
+        ]
+        for view, value in sorted(metrics['counters'].get(name, {}).items()):
+            lines.append(f'api_{name}_total{{view="{view}"}} {value}')
+    histograms = sorted(metrics['histograms'].items())
+    lines += [
+        '# HELP api_request_duration_seconds Время обработки запроса.',
+        '# TYPE api_request_duration_seconds histogram',
+    ]
+    for view, histogram in histograms:
+        cumulative = 0
+        for bound, amount in zip((*BUCKETS, '+Inf'), histogram[:-1]):
+            cumulative += amount
+            lines.append(
+                f'api_request_duration_seconds_bucket'
+                f'{{view="{view}",le="{bound}"}} {cumulative}'
+            )
+        lines += [
+            f'api_request_duration_seconds_sum{{view="{view}"}} '
+            f'{histogram[-1]:.6f}',
+            f'api_request_duration_seconds_count{{view="{view}"}} '
+            f'{cumulative}',
+        ]
+    lines += [
+        '# HELP api_request_duration_quantile_seconds Квантили времени '
+        'обработки, оценка по корзинам.',
+        '# TYPE api_request_duration_quantile_seconds gauge',
+    ]
+    for view, histogram in histograms:
+        for share in QUANTILES:
+            lines.append(
+                f'api_request_duration_quantile_seconds'
+                f'{{view="{view}",quantile="{share}"}} '
+                f'{quantile(histogram, share):.6f}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Записывает длительность, SQL-запросы и исход каждого запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        registry.observe(
+            view_name(request),
+            time.perf_counter() - started,
+            counter.queries,
+            response.status_code,
+            response.get('X-Cache'),
+        )
+        registry.maybe_flush()
+        return response
+
+
+def cache_stats(view_class):
+    """Попадания и промахи кэша ответов в действиях вьюсета."""
+    counters = registry.collect()['counters']
+    prefix = f'{view_class.__name__}.'
+    return {
+        event: sum(
+            value for view, value in counters.get(f'cache_{event}', {}).items()
+            if view.startswith(prefix)
+        )
+        for event in ('hits', 'misses')
+    }
+
+
+def metrics_view(request):
+    """Метрики для Prometheus по токену ``Authorization: Bearer <токен>``.
+
+    Без settings.METRICS_TOKEN адрес не существует.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    if not hmac.compare_digest(
+        request.headers.get('Authorization', '').encode(),
+        f'Bearer {token}'.encode(),
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
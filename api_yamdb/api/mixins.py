@@ -1,6 +1,95 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
 from reviews.validators import validate_username
+from . import caching
 
 
 class ValidateUsernameMixin:
     def validate_username(self, username):
         return validate_username(username)
+
+
+class ResourceMixin:
+    """Имя ресурса, по версии которого кэшируются ответы вьюсета."""
+
+    resource = None
+
+    def get_resources(self):
+        return (self.resource,)
+
+
+class ConditionalListMixin(ResourceMixin):
+    """Условный GET для list.
+
+    ETag и Last-Modified строятся по версиям ресурсов, поэтому при
+    совпадении If-None-Match ответ 304 отдаётся без выборки и сериализации.
+    """
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if not caching.is_shared():
+            return handler(request, *args, **kwargs)
+        versions = caching.get_versions(*self.get_resources())
+        etag = caching.etag(versions, request, self)
+        last_modified = caching.last_modified(versions)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code not in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalReadMixin(ConditionalListMixin):
+    """Условный GET для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedReadMixin(ResourceMixin):
+    """Кэширует ответы list/retrieve до следующей записи в ресурс.
+
+    Попадания и промахи считает api.metrics по заголовку X-Cache: чтение из
+    кэша ничего в кэш не пишет.
+    """
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not caching.is_shared():
+            return handler(request, *args, **kwargs)
+        key = caching.response_key(self.resource, request, self)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key, response.data, settings.RESPONSE_CACHE_TIMEOUT
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
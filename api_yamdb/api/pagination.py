@@ -0,0 +1,118 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TitlePagination(PageNumberPagination):
+    """Постраничная выдача с режимом курсора по запросу.
+
+    Если в запросе есть параметр ``cursor`` (для первой страницы - пустой),
+    выборка идёт поиском по ключу ``(year, name, id)`` без OFFSET и COUNT.
+    Свой порядок курсор не допускает: ``ordering`` и ``search`` с ним - 400.
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('year', 'name', 'id')
+    cursor_types = (int, str, int)
+    cursor_conflicts = ('ordering', 'search')
+    invalid_cursor_message = 'Неверный курсор.'
+    cursor_conflict_message = 'Курсор нельзя сочетать с параметром {}.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        for param in self.cursor_conflicts:
+            if request.query_params.get(param):
+                raise ValidationError({
+                    self.cursor_query_param: [
+                        self.cursor_conflict_message.format(param)
+                    ]
+                })
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        ordering = self.cursor_ordering
+        if reverse:
+            ordering = tuple(f'-{field}' for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek(position, reverse))
+        page = list(queryset[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        )))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def seek(self, position, reverse):
+        """Условие «строго после позиции» для составного ключа."""
+        lookup = 'lt' if reverse else 'gt'
+        condition, equal = Q(), {}
+        for field, value in zip(self.cursor_ordering, position):
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def encode_cursor(self, title, reverse):
+        position = [getattr(title, field) for field in self.cursor_ordering]
+        token = base64.urlsafe_b64encode(
+            json.dumps(dict(p=position, r=int(reverse))).encode()
+        ).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token.encode()))
+            position, reverse = cursor['p'], bool(cursor['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.cursor_types
+        ) or any(
+            type(value) is not value_type
+            for value, value_type in zip(position, self.cursor_types)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
@@ -0,0 +1,78 @@
+"""Профилирование отдельного запроса по требованию администратора.
+
+Запрос с заголовком ``X-Profile: 1`` или параметром ``?profile=1`` от
+администратора выполняется под cProfile. Профиль сохраняется в
+settings.PROFILE_DIR (``.prof`` для pstats/snakeviz и ``.txt`` со
+сводкой самых затратных функций), имя файла - в заголовке ответа.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+
+
+def is_admin(request):
+    """Проверяет токен так же, как DRF, не дожидаясь представления."""
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    user = authenticated[0] if authenticated else getattr(
+        request, 'user', None
+    )
+    return bool(user and user.is_authenticated and user.is_admin)
+
+
+def profile_name(request):
+    path = re.sub(r'[^\w-]+', '-', request.path).strip('-')
+    return (
+        f'{datetime.now().strftime("%Y%m%d-%H%M%S-%f")}-'
+        f'{request.method}-{path}'
+    )
+
+
+def summary(profile, top):
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats(
+        pstats.SortKey.CUMULATIVE
+    ).print_stats(top)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """Профилирует запросы администратора, помеченные флагом."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        directory = settings.PROFILE_DIR
+        if not directory or not (
+            request.META.get(PROFILE_HEADER) == '1'
+            or request.GET.get(PROFILE_PARAM) == '1'
+        ) or not is_admin(request):
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+        os.makedirs(directory, exist_ok=True)
+        name = profile_name(request)
+        profile.dump_stats(os.path.join(directory, f'{name}.prof'))
+        with open(
+            os.path.join(directory, f'{name}.txt'), 'w', encoding='utf-8'
+        ) as file:
+            file.write(summary(profile, settings.PROFILE_TOP))
+        response['X-Profile'] = f'{name}.prof'
+        return response
@@ -1,8 +1,11 @@
 from django.conf import settings
+from django.db import IntegrityError
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 
 from .mixins import ValidateUsernameMixin
+from .timing import TimedRepresentationMixin
 from reviews.models import Category, Comment, Genre, Review, Title, User
 from reviews.validators import validate_year
 
@@ -29,7 +32,10 @@ class TokenSerializer(serializers.Serializer, ValidateUsernameMixin):
     )
 
 
-class UserSerializer(serializers.ModelSerializer, ValidateUsernameMixin):
+class UserSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer,
+    ValidateUsernameMixin,
+):
 
     class Meta:
         model = User
@@ -44,29 +50,38 @@ class UsersProfileSerializer(UserSerializer):
         read_only_fields = ('role',)
 
 
-class CategoriesSerializer(serializers.ModelSerializer):
+class CategoriesSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
 
     class Meta:
         fields = ('name', 'slug',)
         model = Category
 
 
-class GenresSerializer(serializers.ModelSerializer):
+class GenresSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         fields = ('name', 'slug',)
         model = Genre
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     genre = GenresSerializer(many=True)
     category = CategoriesSerializer()
     rating = serializers.IntegerField(read_only=True)
+    # Число отзывов совпадает с числом оценок, которое уже хранится.
+    reviews_count = serializers.IntegerField(
+        source='score_count', read_only=True
+    )
 
     class Meta:
         model = Title
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category',
+            'id', 'name', 'year', 'rating', 'reviews_count', 'description',
+            'genre', 'category',
         )
         read_only_fields = ('__all__',)
 
@@ -95,7 +110,7 @@ class TitlesSerializer(serializers.ModelSerializer):
         return TitleReadSerializer(title).data
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class ReviewsSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
 
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -103,24 +118,35 @@ class ReviewsSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date',)
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comments_count',
+        )
         model = Review
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method != 'POST':
-            return data
-        if Review.objects.filter(
-            title=self.context['view'].kwargs.get('title_id'),
-            author=request.user
-        ).exists():
-            raise ValidationError(
+    def create(self, validated_data):
+        """Повторный отзыв отсекает ограничение unique_review_for_user.
+
+        Вставка и пересчёт рейтинга идут в одной транзакции Review.save,
+        поэтому отдельная проверка перед записью не нужна. Отзыв автора
+        ищется только после ошибки: прочие нарушения целостности не
+        выдаются за повторный отзыв.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author'],
+            ).exists():
+                raise
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
                 'Вы уже оставили отзыв на это произведение'
-            )
-        return data
+            ]})
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
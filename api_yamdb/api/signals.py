@@ -0,0 +1,94 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_written
+from . import caching
+
+# Версии, которые устаревают после записи в таблицу модели. reviews - общая
+# версия всех списков отзывов: её меняет только массовая запись, а save()
+# и delete() меняют версию списка отзывов одного произведения.
+RESOURCES = {
+    Category: ('titles', 'categories'),
+    Genre: ('titles', 'genres'),
+    Title: ('titles', 'reviews'),
+    Title.genre.through: ('titles',),
+    # Отзывы показывают имя автора.
+    User: ('users',),
+    Review: ('titles', 'reviews'),
+    # Отзывы показывают число комментариев.
+    Comment: ('reviews',),
+}
+
+
+def bump_on_commit(*resources):
+    """Меняет версии после коммита, чтобы не закэшировать старые данные."""
+    for resource in resources:
+        transaction.on_commit(partial(caching.bump_version, resource))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    bump_on_commit('titles', f'reviews:{instance.pk}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_on_commit(*RESOURCES[sender])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    bump_on_commit('titles', f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    # Отзывы показывают число комментариев. При каскаде с отзывом или
+    # автором версии меняют их собственные сигналы.
+    if getattr(instance, 'deleted_with', None):
+        return
+    title_ids = {instance.review.title_id}
+    stored_review_id = getattr(instance, 'stored_review_id', None)
+    if stored_review_id not in (None, instance.review_id):
+        title_ids.update(Review.objects.filter(
+            pk=stored_review_id
+        ).values_list('title_id', flat=True))
+    bump_on_commit(*(f'reviews:{title_id}' for title_id in title_ids))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre(sender, **kwargs):
+    bump_on_commit(*RESOURCES[Genre])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, **kwargs):
+    bump_on_commit(*RESOURCES[Category])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, **kwargs):
+    bump_on_commit(*RESOURCES[User])
+
+
+@receiver(bulk_written)
+def invalidate_tables(sender, models, **kwargs):
+    """Меняет версии один раз после массовой записи.
+
+    Списки отзывов сбрасываются общей версией reviews, а не по одной
+    версии на произведение.
+    """
+    bump_on_commit(*{
+        resource for model in models for resource in RESOURCES[model]
+    })
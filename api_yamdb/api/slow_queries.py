@@ -0,0 +1,84 @@
+"""Журнал медленных SQL-запросов.
+
+Запросы дольше settings.SLOW_QUERY_THRESHOLD_MS пишутся в лог
+``api.slow_queries`` JSON-строкой: текст, параметры, вид запроса,
+действие API и, для SQLite, план из EXPLAIN QUERY PLAN. Сводку по
+журналу строит команда ``manage.py slow_queries``.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .duplicates import statement_shape
+from .metrics import view_name
+
+logger = logging.getLogger(__name__)
+
+
+def explain(connection, sql, params):
+    """Строки плана запроса; для других СУБД и executemany - пусто.
+
+    Курсор драйвера берётся в обход обёрток execute_wrapper, поэтому
+    EXPLAIN не попадает в число запросов, тайминги и поиск повторов.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    try:
+        with connection.wrap_database_errors:
+            cursor = connection.create_cursor()
+            try:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return [row[-1] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+    except DatabaseError as error:
+        return [f'EXPLAIN не выполнен: {error}']
+
+
+class SlowQueryRecorder:
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self.log(sql, params, many, context['connection'], duration)
+
+    def log(self, sql, params, many, connection, duration):
+        plan = [] if many else explain(connection, sql, params)
+        logger.warning(json.dumps(dict(
+            duration_ms=round(duration * 1000, 3),
+            view=view_name(self.request),
+            path=self.request.path,
+            shape=statement_shape(sql),
+            sql=sql,
+            params=None if many else params,
+            plan=plan,
+        ), ensure_ascii=False, default=str))
+
+
+class SlowQueryMiddleware:
+    """Следит за длительностью SQL-запросов, если задан порог."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold is None:
+            return self.get_response(request)
+        recorder = SlowQueryRecorder(request, threshold)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
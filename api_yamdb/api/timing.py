@@ -0,0 +1,156 @@
+"""Замер фаз обработки запроса для заголовка Server-Timing.
+
+Таймер запроса хранится в contextvar и существует только у попавших в
+выборку запросов; остальные платят за проверку одного contextvar.
+"""
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+# Фаза и её описание в заголовке (значение заголовка - только latin-1).
+PHASES = {
+    'db': 'SQL',
+    'auth': 'Authentication',
+    'serialization': 'Serialization',
+    'render': 'Rendering',
+    'total': 'Total',
+}
+
+current_timer = ContextVar('current_timer', default=None)
+
+
+class RequestTimer:
+    """Длительности фаз одного запроса, секунды.
+
+    Время SQL-запросов вычитается из фазы, во время которой они
+    выполнялись, поэтому фазы не пересекаются (кроме total).
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.queries = 0
+        self.active = set()
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations['db'] += time.perf_counter() - started
+            self.queries += 1
+
+    def measure(self, name, function, *args, **kwargs):
+        # Вложенные вызовы той же фазы (вложенные сериализаторы) уже
+        # учтены внешним вызовом.
+        if name in self.active:
+            return function(*args, **kwargs)
+        self.active.add(name)
+        db_before = self.durations['db']
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.durations[name] += (
+                time.perf_counter() - started
+                - (self.durations['db'] - db_before)
+            )
+            self.active.discard(name)
+
+    def header(self):
+        return ', '.join(
+            f'{name};dur={self.durations[name] * 1000:.2f};desc="{desc}"'
+            for name, desc in PHASES.items()
+        )
+
+    def record(self, request, response):
+        match = request.resolver_match
+        return dict(
+            method=request.method,
+            path=request.path,
+            view=match.view_name if match else None,
+            status=response.status_code,
+            queries=self.queries,
+            **{
+                f'{name}_ms': round(self.durations[name] * 1000, 2)
+                for name in PHASES
+            },
+        )
+
+
+def measure(name, function, *args, **kwargs):
+    timer = current_timer.get()
+    if timer is None:
+        return function(*args, **kwargs)
+    return timer.measure(name, function, *args, **kwargs)
+
+
+class ServerTimingMiddleware:
+    """Замеряет доле settings.SERVER_TIMING_SAMPLE_RATE запросов.
+
+    Результат отдаётся в заголовке Server-Timing и пишется в лог одной
+    JSON-строкой.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+        timer = RequestTimer()
+        token = current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timer.execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        timer.durations['total'] = time.perf_counter() - started
+        response['Server-Timing'] = timer.header()
+        logger.info(json.dumps(
+            timer.record(request, response), ensure_ascii=False
+        ))
+        return response
+
+
+class TimedJWTAuthentication(JWTAuthentication):
+
+    def authenticate(self, request):
+        return measure('auth', super().authenticate, request)
+
+
+class TimedRepresentationMixin:
+    """Учитывает сериализацию ответа в фазе serialization."""
+
+    def to_representation(self, instance):
+        return measure(
+            'serialization', super().to_representation, instance
+        )
+
+
+class TimedJSONRenderer(JSONRenderer):
+
+    def render(self, *args, **kwargs):
+        return measure('render', super().render, *args, **kwargs)
+
+
+class TimedBrowsableAPIRenderer(BrowsableAPIRenderer):
+
+    def render(self, *args, **kwargs):
+        return measure('render', super().render, *args, **kwargs)
@@ -3,18 +3,23 @@ import random
 from django.conf import settings
 from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import (
     filters, generics, mixins, permissions,
     status, views, viewsets
 )
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 
 from reviews.models import Category, Genre, Review, Title, User
-from .filters import GenreCategoryFilter
+from .filters import GenreCategoryFilter, TitleSearchFilter
+from .metrics import cache_stats
+from .mixins import (
+    CachedReadMixin, ConditionalListMixin, ConditionalReadMixin,
+)
+from .pagination import TitlePagination
 from .permissions import (
     AdminOnly, IsAdminOrReadOnly, IsAuthorAdminModeratorOrReadOnly,
 )
@@ -105,30 +110,44 @@ class UserMeView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalReadMixin, CachedReadMixin, viewsets.ModelViewSet
+):
+    resource = 'titles'
     queryset = (
         Title.objects
-        .annotate(rating=Avg('reviews__score'))
+        .select_related('category')
+        .prefetch_related('genre')
         .order_by('year', 'name')
     )
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     permission_classes = (IsAdminOrReadOnly,)
     http_method_names = ('get', 'post', 'patch', 'delete',)
     filter_backends = (
         DjangoFilterBackend,
         filters.OrderingFilter,
         GenreCategoryFilter,
+        TitleSearchFilter,
     )
-    filterset_fields = ('category__slug', 'genre__slug', 'name', 'year',)
+    filterset_fields = ('name', 'year',)
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleReadSerializer
         return TitlesSerializer
 
+    @action(
+        detail=False,
+        url_path='cache-stats',
+        permission_classes=(AdminOnly,),
+        pagination_class=None,
+    )
+    def cache_stats(self, request):
+        return Response(cache_stats(type(self)))
+
 
 class BaseGroupViewSet(
-    mixins.CreateModelMixin, mixins.ListModelMixin,
+    ConditionalListMixin, mixins.CreateModelMixin, mixins.ListModelMixin,
     mixins.DestroyModelMixin, viewsets.GenericViewSet
 ):
     pagination_class = PageNumberPagination
@@ -142,51 +161,79 @@ class BaseGroupViewSet(
 
 
 class CategoriesViewSet(BaseGroupViewSet):
+    resource = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategoriesSerializer
 
 
 class GenresViewSet(BaseGroupViewSet):
+    resource = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenresSerializer
 
 
 class BasePublicationsViewSet(viewsets.ModelViewSet):
+    """Отзывы и комментарии, вложенные в родительский объект из URL.
+
+    Родитель загружается не больше одного раза за запрос, а отдельные
+    записи выбираются сразу по id родителя из URL, без его загрузки.
+    Поля поиска заданы как {поле модели: аргумент URL}.
+    """
+
     permission_classes = (IsAuthorAdminModeratorOrReadOnly,)
     http_method_names = ('get', 'post', 'patch', 'delete',)
+    parent_queryset = None
+    parent_lookups = None
+    lookups = None
+    parent = None
+
+    def url_lookups(self, lookups):
+        return {
+            field: self.kwargs.get(kwarg) for field, kwarg in lookups.items()
+        }
+
+    def get_parent(self):
+        if self.parent is None:
+            self.parent = generics.get_object_or_404(
+                self.parent_queryset, **self.url_lookups(self.parent_lookups)
+            )
+        return self.parent
 
+    def get_queryset(self):
+        if self.action == 'list':
+            self.get_parent()
+        return self.serializer_class.Meta.model.objects.filter(
+            **self.url_lookups(self.lookups)
+        ).select_related('author')
 
-class ReviewsViewSet(BasePublicationsViewSet):
-    serializer_class = ReviewsSerializer
 
-    def get_title(self):
-        return generics.get_object_or_404(
-            Title, id=self.kwargs.get('title_id')
-        )
+class ReviewsViewSet(ConditionalReadMixin, BasePublicationsViewSet):
+    serializer_class = ReviewsSerializer
+    parent_queryset = Title.objects.all()
+    parent_lookups = {'id': 'title_id'}
+    lookups = {'title_id': 'title_id'}
 
-    def get_queryset(self):
-        return self.get_title().reviews.all()
+    def get_resources(self):
+        return f'reviews:{self.kwargs.get("title_id")}', 'reviews', 'users'
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            title=self.get_title()
-        )
+        serializer.save(author=self.request.user, title=self.get_parent())
 
 
 class CommentViewSet(BasePublicationsViewSet):
     serializer_class = CommentsSerializer
-
-    def get_review(self):
-        return generics.get_object_or_404(
-            Review, id=self.kwargs.get('review_id')
-        )
+    # Отзыв с чужим title_id в URL не найдётся: 404, а не чужие данные.
+    parent_queryset = Review.objects.select_related('title')
+    parent_lookups = {'id': 'review_id', 'title_id': 'title_id'}
+    lookups = {'review_id': 'review_id', 'review__title_id': 'title_id'}
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            # Сигналы записи берут произведение из отзыва комментария;
+            # таблица отзывов уже присоединена фильтром по title_id.
+            queryset = queryset.select_related('review')
+        return queryset
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            review=self.get_review(),
-        )
+        serializer.save(author=self.request.user, review=self.get_parent())
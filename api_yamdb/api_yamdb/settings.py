@@ -28,6 +28,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.timing.ServerTimingMiddleware',
+    'api.duplicates.DuplicateQueryMiddleware',
+    'api.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,6 +39,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -65,6 +70,19 @@ DATABASES = {
     }
 }
 
+# Cache versions and cached responses must be shared by all workers, so the
+# default is a file cache in the project directory, readable only by the
+# user running the workers. For several hosts use Redis or Memcached. With
+# a process-local backend (LocMemCache) response caching and ETags are
+# switched off.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(BASE_DIR / '.cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -107,12 +125,38 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'slow_queries': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'slow_queries.log',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.timing': {'handlers': ['console'], 'level': 'INFO'},
+        'api.duplicates': {'handlers': ['console'], 'level': 'WARNING'},
+        'api.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.timing.TimedJWTAuthentication",
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.timing.TimedJSONRenderer',
+        'api.timing.TimedBrowsableAPIRenderer',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
@@ -139,6 +183,37 @@ MAXIMUM_SCORE = 10
 # Name  cutter constant
 OUTPUT_LENGTH = 25
 
+# Response cache lifetime, seconds
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+
+# Share of requests measured by ServerTimingMiddleware (0 - disabled)
+SERVER_TIMING_SAMPLE_RATE = 1.0 if DEBUG else 0.01
+
+# Local directory where the gunicorn workers of a host write their metrics
+# for /metrics to sum up (None - metrics of the current process only), and
+# how often, in seconds, each worker writes there
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 5
+# Bearer token required by /metrics (None - the endpoint is disabled)
+METRICS_TOKEN = None
+
+# Repeated SQL detection: None (disabled), 'log', 'header' or 'raise',
+# and how many statements of the same shape count as duplicates
+DUPLICATE_QUERY_MODE = None
+DUPLICATE_QUERY_THRESHOLD = 3
+
+# Statements slower than this, milliseconds, are written with their query
+# plan to SLOW_QUERY_LOG (None - disabled, e.g. 100 while investigating);
+# see manage.py slow_queries
+SLOW_QUERY_THRESHOLD_MS = None
+SLOW_QUERY_LOG = LOGGING['handlers']['slow_queries']['filename']
+
+# Where admin requests flagged with X-Profile: 1 or ?profile=1 save their
+# cProfile output (None - disabled; use a directory outside the source tree)
+# and how many functions the summary lists
+PROFILE_DIR = None
+PROFILE_TOP = 30
+
 # Pincode constants
 PINCODE_LENGTH = 6  # Length of the pincode
 PINCODE_CHARS = '1234567890'    # Char that will be used for generate pincode
@@ -0,0 +1,54 @@
+"""Общие шаги массовой записи в БД в обход ``save()`` и сигналов."""
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews import search
+from reviews.management.csv_files import chunked
+from reviews.models import Review, Title
+
+CHUNK_SIZE = 1000
+
+
+def bulk_insert(model_class, objects, chunk_size=CHUNK_SIZE):
+    """Вставляет объекты из потока пачками, каждую в своей транзакции."""
+    inserted = 0
+    for chunk in chunked(objects, chunk_size):
+        with transaction.atomic():
+            model_class.objects.bulk_create(chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def refresh_titles(rated_ids=None, indexed_ids=None):
+    """Пересчитывает рейтинги и поисковый индекс произведений.
+
+    ``None`` означает все произведения, иначе - только перечисленные.
+    """
+    if rated_ids is None:
+        Title.recount_ratings()
+    else:
+        for title_ids in chunked(sorted(rated_ids), CHUNK_SIZE):
+            Title.recount_ratings(title_ids)
+    if not search.is_enabled():
+        return
+    if indexed_ids is None:
+        search.rebuild_index()
+    else:
+        for title_ids in chunked(sorted(indexed_ids), CHUNK_SIZE):
+            search.reindex_titles(title_ids)
+
+
+def refresh_reviews(review_ids=None):
+    """Пересчитывает число комментариев к отзывам (все при ``None``)."""
+    if review_ids is None:
+        Review.recount_comments()
+        return
+    for chunk in chunked(sorted(review_ids), CHUNK_SIZE):
+        Review.recount_comments(chunk)
+
+
+def reset_sequences(models):
+    """Сдвигает последовательности после вставки с явными id."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
@@ -0,0 +1,220 @@
+import random
+import time
+from datetime import datetime
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db.models import Max
+
+from reviews.management.bulk import (
+    CHUNK_SIZE, bulk_insert, refresh_reviews, refresh_titles, reset_sequences,
+)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_written
+
+WORDS = (
+    'тёмный', 'последний', 'город', 'ночь', 'море', 'дорога', 'тайна',
+    'война', 'любовь', 'звезда', 'песня', 'время', 'дом', 'сад', 'лес',
+    'огонь', 'ветер', 'зима', 'лето', 'король', 'сон', 'небо', 'остров',
+    'шторм', 'маяк', 'сердце', 'тень', 'свет', 'камень', 'река', 'mirror',
+    'space', 'blue', 'night', 'road', 'ghost', 'machine', 'garden',
+)
+# Веса оценок 1..10: зрители чаще ставят высокие оценки.
+SCORE_WEIGHTS = (2, 1, 2, 3, 5, 8, 13, 18, 16, 12)
+# Чем больше показатель, тем сильнее перекос популярности к началу списка.
+TITLE_POPULARITY_SKEW = 3.0
+REVIEW_POPULARITY_SKEW = 4.0
+USER_ACTIVITY_SKEW = 0.8
+MODERATOR_SHARE = 0.01
+ADMIN_SHARE = 0.001
+MAX_GENRES_PER_TITLE = 3
+
+
+def skewed_index(rng, size, skew):
+    """Случайный индекс из range(size), смещённый к началу диапазона."""
+    return min(int(size * rng.random() ** skew), size - 1)
+
+
+def words(rng, minimum, maximum):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(minimum, maximum)))
+
+
+def first_id(model_class):
+    return (model_class.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+
+def review_counts(rng, users, total, titles):
+    """Число отзывов каждого пользователя: немногие пишут очень много."""
+    weights = [1 / (rank + 1) ** USER_ACTIVITY_SKEW for rank in range(users)]
+    scale = total / sum(weights)
+    counts = [min(int(weight * scale), titles) for weight in weights]
+    shortage = min(total, users * titles) - sum(counts)
+    while shortage > 0:
+        user = rng.randrange(users)
+        if counts[user] < titles:
+            counts[user] += 1
+            shortage -= 1
+    return counts
+
+
+class Command(BaseCommand):
+    """Команда для генерации синтетических данных для нагрузочных тестов.
+
+    Одинаковые параметры и ``--seed`` на одинаковой БД дают одинаковые
+    данные. Популярность произведений, активность пользователей и оценки
+    распределены неравномерно, как в живом каталоге.
+    """
+
+    help = 'Генерирует синтетические данные для нагрузочного тестирования.'
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('categories', 10, 'категорий'),
+            ('genres', 30, 'жанров'),
+            ('titles', 1000, 'произведений'),
+            ('users', 200, 'пользователей'),
+            ('reviews', 20000, 'отзывов'),
+            ('comments', 20000, 'комментариев'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько {help_text} создать.',
+            )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        categories = self.insert(
+            Category, self.groups, Category, options['categories']
+        )
+        genres = self.insert(Genre, self.groups, Genre, options['genres'])
+        titles = self.insert(Title, self.titles, options['titles'], categories)
+        self.insert(Title.genre.through, self.title_genres, titles, genres)
+        users = self.insert(User, self.users, options['users'])
+        reviews = self.insert(
+            Review, self.reviews, options['reviews'], titles, users
+        )
+        self.insert(
+            Comment, self.comments, options['comments'], reviews, users
+        )
+
+        started = time.perf_counter()
+        refresh_titles()
+        refresh_reviews()
+        models = (
+            Category, Genre, Title, Title.genre.through, User, Review,
+            Comment,
+        )
+        reset_sequences(models)
+        bulk_written.send(sender=type(self), models=models)
+        self.stdout.write(
+            f'пересчёт: {time.perf_counter() - started:.2f} с'
+        )
+        self.stdout.write(self.style.SUCCESS('Данные созданы!'))
+
+    def insert(self, model_class, generate, *args):
+        """Вставляет объекты из генератора и возвращает диапазон их id."""
+        start = first_id(model_class)
+        started = time.perf_counter()
+        inserted = bulk_insert(
+            model_class, generate(start, *args), self.chunk_size
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{model_class._meta.model_name}: {inserted} строк за '
+            f'{elapsed:.2f} с ({inserted / max(elapsed, 1e-6):.0f} строк/с)'
+        )
+        return range(start, start + inserted)
+
+    def groups(self, start, model_class, amount):
+        prefix = model_class._meta.model_name
+        for pk in range(start, start + amount):
+            yield model_class(
+                pk=pk, name=f'{model_class._meta.verbose_name} {pk}',
+                slug=f'{prefix}-{pk}',
+            )
+
+    def titles(self, start, amount, categories):
+        current_year = datetime.now().year
+        for pk in range(start, start + amount):
+            yield Title(
+                pk=pk,
+                name=f'{words(self.rng, 1, 4).capitalize()} {pk}',
+                year=self.rng.randint(1900, current_year),
+                description=words(self.rng, 0, 30),
+                category_id=categories[skewed_index(
+                    self.rng, len(categories), TITLE_POPULARITY_SKEW
+                )] if categories else None,
+            )
+
+    def title_genres(self, start, titles, genres):
+        if not genres:
+            return
+        pk = start
+        for title_id in titles:
+            amount = self.rng.randint(
+                1, min(MAX_GENRES_PER_TITLE, len(genres))
+            )
+            for genre_id in self.rng.sample(genres, amount):
+                yield Title.genre.through(
+                    pk=pk, title_id=title_id, genre_id=genre_id
+                )
+                pk += 1
+
+    def users(self, start, amount):
+        for pk in range(start, start + amount):
+            chance = self.rng.random()
+            role = User.RoleChoice.user
+            if chance < ADMIN_SHARE:
+                role = User.RoleChoice.admin
+            elif chance < ADMIN_SHARE + MODERATOR_SHARE:
+                role = User.RoleChoice.moderator
+            yield User(
+                pk=pk, username=f'user{pk}', email=f'user{pk}@yamdb.fake',
+                role=role,
+            )
+
+    def reviews(self, start, amount, titles, users):
+        if not titles or not users:
+            return
+        scores = range(settings.MINIMUM_SCORE, settings.MAXIMUM_SCORE + 1)
+        cum_weights = list(accumulate(SCORE_WEIGHTS))
+        pk = start
+        counts = review_counts(self.rng, len(users), amount, len(titles))
+        for author_id, count in zip(users, counts):
+            for title_id in sorted(self.pick_titles(titles, count)):
+                yield Review(
+                    pk=pk, title_id=title_id, author_id=author_id,
+                    score=self.rng.choices(scores, cum_weights=cum_weights)[0],
+                    text=words(self.rng, 3, 60),
+                )
+                pk += 1
+
+    def pick_titles(self, titles, count):
+        """Разные произведения для одного автора; популярные - чаще."""
+        if count * 2 > len(titles):
+            return self.rng.sample(titles, count)
+        chosen = set()
+        while len(chosen) < count:
+            chosen.add(titles[skewed_index(
+                self.rng, len(titles), TITLE_POPULARITY_SKEW
+            )])
+        return chosen
+
+    def comments(self, start, amount, reviews, users):
+        if not reviews or not users:
+            return
+        for pk in range(start, start + amount):
+            yield Comment(
+                pk=pk,
+                review_id=reviews[skewed_index(
+                    self.rng, len(reviews), REVIEW_POPULARITY_SKEW
+                )],
+                author_id=users[skewed_index(
+                    self.rng, len(users), USER_ACTIVITY_SKEW + 1
+                )],
+                text=words(self.rng, 1, 30),
+            )
@@ -1,14 +1,27 @@
-import csv
-import sqlite3
+import hashlib
 import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from graphlib import TopologicalSorter
+from multiprocessing import Manager
 
 from django.conf import settings
 from django.core.management import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, connections, transaction
 
+from reviews.management.bulk import (
+    CHUNK_SIZE, refresh_reviews, refresh_titles, reset_sequences
+)
+from reviews.management.csv_files import (
+    QUEUE_CHUNKS, consume_chunks, find_csv, produce_chunks, read_chunks,
+    read_header
+)
 from reviews.models import (
     Category, Comment, Genre, Review, Title, User
 )
+from reviews.signals import bulk_written
 
 
 FILES_PATH = os.path.join(settings.BASE_DIR, 'static/data/')
@@ -18,6 +31,7 @@ IMPORT_MODELS = {
     'category': Category,
     'genre': Genre,
     'titles': Title,
+    'genre_title': Title.genre.through,
     'users': User,
     'review': Review,
     'comments': Comment,
@@ -31,78 +45,319 @@ FIELD_MAPPING = {
     'review_id': ('review', Review),
 }
 
+# Поле, по значениям которого finalize пересчитывает затронутые upsert
+# записи: поисковый индекс, рейтинги и число комментариев.
+REFRESH_FIELDS = {
+    'titles': 'pk',
+    'review': 'title_id',
+    'comments': 'review_id',
+}
 
-def open_csv_file(file_name):
-    """Открывает CSV файл."""
-    csv_file = file_name + '.csv'
-    csv_path = os.path.join(FILES_PATH, csv_file)
-    try:
-        with open(csv_path, encoding='utf-8') as file:
-            return list(csv.reader(file))
-    except FileNotFoundError:
-        print(f'Файл {csv_file} не найден.')
-        return None
+TABLES = {model_class: file_name
+          for file_name, model_class in IMPORT_MODELS.items()}
+
+
+def find_files(file_names):
+    """Пути к найденным файлам; об отсутствующих выводится сообщение."""
+    paths = {}
+    for file_name in file_names:
+        csv_path = find_csv(FILES_PATH, file_name)
+        if csv_path is None:
+            print(f'Файл {file_name}.csv не найден.')
+        else:
+            paths[file_name] = csv_path
+    return paths
+
+
+def load_foreign_ids(header, rows=None):
+    """Загружает id связанных записей для внешних ключей таблицы.
 
+    Если переданы строки, загружаются только упомянутые в них id, и
+    память не зависит от размера связанных таблиц.
+    """
+    foreign_ids = {}
+    for field_key, (field_name, model_class) in FIELD_MAPPING.items():
+        if field_key not in header:
+            continue
+        ids = model_class.objects.values_list('pk', flat=True)
+        if rows is not None:
+            ids = ids.filter(pk__in={row[field_key] for row in rows})
+        foreign_ids[field_key] = (field_name, {str(pk) for pk in ids})
+    return foreign_ids
 
-def replace_foreign_values(data_csv):
-    """Заменяет значения в CSV данных."""
+
+def replace_foreign_values(data_csv, foreign_ids):
+    """Заменяет значения внешних ключей в CSV данных на их id."""
     data_csv_copy = data_csv.copy()
-    for field_key, field_value in data_csv.items():
-        if field_key in FIELD_MAPPING:
-            field_name, model_class = FIELD_MAPPING[field_key]
-            data_csv_copy[field_name] = model_class.objects.get(pk=field_value)
+    for field_key, (field_name, ids) in foreign_ids.items():
+        field_value = data_csv_copy.pop(field_key)
+        if field_value not in ids:
+            raise ValueError(
+                f'Не найдена запись {field_name} с id={field_value}'
+            )
+        data_csv_copy[f'{field_name}_id'] = field_value
     return data_csv_copy
 
 
-def load_csv(file_name, model_class):
-    """Загружает CSV файлы."""
-    data = open_csv_file(file_name)
-    if not data:
-        return
+def upsert_fields(model_class, header):
+    """Поля модели из колонок CSV, которые сравниваются и обновляются."""
+    fields = []
+    for column in header:
+        field_name = FIELD_MAPPING.get(column, (column,))[0]
+        field = model_class._meta.get_field(field_name)
+        if not field.primary_key and not getattr(field, 'auto_now_add', False):
+            fields.append(field)
+    return fields
+
+
+def content_hash(fields, values):
+    return hashlib.md5(repr(tuple(
+        field.to_python(value) for field, value in zip(fields, values)
+    )).encode()).hexdigest()
+
 
-    header, rows = data[0], data[1:]
-    for row in rows:
-        data_csv = dict(zip(header, row))
-        data_csv = replace_foreign_values(data_csv)
-        try:
-            model_instance = model_class(**data_csv)
-            model_instance.save()
-        except (ValueError, IntegrityError) as error:
-            print(f'Ошибка в загружаемых данных. {error}.')
-            break
+def upsert_objects(model_class, objects, fields, touched, key=None):
+    """Вставляет новые записи, обновляет изменённые, пропускает остальные.
+
+    Записи сопоставляются по первичному ключу и хэшу содержимого. В touched
+    собираются значения поля key затронутых записей до и после записи.
+    """
+    attnames = [field.attname for field in fields]
+    existing = {
+        str(values['pk']): values
+        for values in model_class.objects.filter(
+            pk__in=[obj.pk for obj in objects]
+        ).values('pk', *attnames)
+    }
+    created, changed = [], []
+    for obj in objects:
+        values = [getattr(obj, attname) for attname in attnames]
+        old_values = existing.get(str(obj.pk))
+        if old_values is None:
+            created.append(obj)
+        elif content_hash(fields, [
+            old_values[attname] for attname in attnames
+        ]) != content_hash(fields, values):
+            changed.append(obj)
+            if key is not None:
+                touched.add(str(old_values[key]))
+        else:
+            continue
+        if key is not None:
+            touched.add(str(getattr(obj, key)))
+    with transaction.atomic():
+        model_class.objects.bulk_create(created)
+        if changed:
+            model_class.objects.bulk_update(
+                changed, [field.name for field in fields]
+            )
+    return Counter(
+        created=len(created),
+        updated=len(changed),
+        unchanged=len(objects) - len(created) - len(changed),
+    )
+
+
+def load_csv(model_class, header, chunks, stream=False, upsert=False,
+             key=None):
+    """Записывает пачки строк CSV файла.
+
+    Таблицы, на которые ссылается файл, к этому моменту уже загружены,
+    поэтому внешние ключи сверяются с БД: все id связанных таблиц
+    загружаются один раз, а в потоковом режиме - запросом на каждую пачку,
+    так что память ограничена размером пачки. Возвращает счётчики
+    created/updated/unchanged и, в режиме upsert, значения поля key
+    затронутых записей.
+    """
+    counts, touched = Counter(), set()
+    try:
+        if not stream:
+            foreign_ids = load_foreign_ids(header)
+        for rows in chunks:
+            if stream:
+                foreign_ids = load_foreign_ids(header, rows)
+            objects = [
+                model_class(**replace_foreign_values(row, foreign_ids))
+                for row in rows
+            ]
+            if upsert:
+                counts += upsert_objects(
+                    model_class, objects,
+                    upsert_fields(model_class, header), touched, key
+                )
+                continue
+            with transaction.atomic():
+                model_class.objects.bulk_create(objects)
+            counts['created'] += len(objects)
+    except (ValueError, TypeError, IntegrityError) as error:
+        print(f'Ошибка в загружаемых данных. {error}.')
+    return counts, touched
+
+
+def import_order(headers):
+    """Порядок загрузки таблиц: сначала те, на которые ссылаются другие.
+
+    Граф зависимостей строится по колонкам из FIELD_MAPPING в заголовках.
+    """
+    graph = {}
+    for file_name, header in headers.items():
+        graph[file_name] = {
+            TABLES[FIELD_MAPPING[column][1]]
+            for column in header
+            if column in FIELD_MAPPING
+            and TABLES.get(FIELD_MAPPING[column][1]) in headers
+        }
+    return tuple(TopologicalSorter(graph).static_order())
+
+
+def parse_files(paths, order, chunk_size, workers, stack):
+    """Пачки строк каждого файла и задачи их разбора.
+
+    При workers > 1 файлы разбираются в пуле процессов одновременно с
+    записью и передаются через ограниченные очереди. Задачи ставятся в
+    порядке загрузки, поэтому записываемый файл всегда уже разбирается.
+    """
+    if workers <= 1:
+        return {
+            file_name: (read_chunks(paths[file_name], chunk_size), None)
+            for file_name in order
+        }
+    # Дочерние процессы не должны наследовать открытые соединения с БД.
+    connections.close_all()
+    pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+    # Менеджер очередей останавливается раньше пула: если запись прервана,
+    # разбор не будет ждать места в очереди.
+    manager = stack.enter_context(Manager())
+    parsed = {}
+    for file_name in order:
+        chunks = manager.Queue(QUEUE_CHUNKS)
+        parsed[file_name] = (
+            consume_chunks(chunks),
+            pool.submit(produce_chunks, paths[file_name], chunk_size, chunks),
+        )
+    return parsed
 
 
 class Command(BaseCommand):
-    """Команда для импорта в базу данных."""
+    """Команда для импорта в базу данных.
+
+    Файлы разбираются параллельно в пуле процессов, а пачки строк
+    записываются в БД последовательно в порядке зависимостей между
+    таблицами.
+    """
 
     help = 'Импортирует записи из CSV в БД.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Сколько строк вставлять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help=(
+                'Проверять внешние ключи по каждой пачке, не загружая '
+                'все id связанных таблиц (для очень больших выгрузок).'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Сколько процессов разбирает файлы параллельно с записью.',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Добавлять новые записи и обновлять изменённые вместо '
+                'загрузки в пустую БД; совпадающие записи пропускаются.'
+            ),
+        )
+
     def handle(self, *args, **options):
-        for file_name, model_class in IMPORT_MODELS.items():
-            load_csv(file_name, model_class)
+        timings = {}
+
+        started = time.perf_counter()
+        paths = find_files(IMPORT_MODELS)
+        headers = {
+            file_name: read_header(csv_path)
+            for file_name, csv_path in paths.items()
+        }
+        order = import_order(headers)
+        timings['порядок загрузки'] = time.perf_counter() - started
 
+        touched = {}
+        with ExitStack() as stack:
+            parsed = parse_files(
+                paths, order, options['chunk_size'], options['workers'],
+                stack,
+            )
+            for file_name in order:
+                started = time.perf_counter()
+                counts, ids = self.write_table(
+                    file_name, headers[file_name], *parsed[file_name],
+                    **options
+                )
+                if counts['created'] or counts['updated']:
+                    touched[file_name] = ids
+                timings[f'запись {file_name}'] = (
+                    time.perf_counter() - started
+                )
+
+        started = time.perf_counter()
+        self.finalize(touched if options['upsert'] else None)
+        timings['пересчёт'] = time.perf_counter() - started
+
+        for stage, seconds in timings.items():
+            self.stdout.write(f'{stage}: {seconds:.2f} с')
         self.stdout.write(
             self.style.SUCCESS('Данные успешно загружены!'))
 
+    def write_table(self, file_name, header, chunks, parsing, **options):
+        started = time.perf_counter()
+        counts, touched = load_csv(
+            IMPORT_MODELS[file_name], header, chunks, options['stream'],
+            options['upsert'], REFRESH_FIELDS.get(file_name),
+        )
+        chunks.close()
+        elapsed = time.perf_counter() - started
+        if parsing is not None:
+            rows, seconds = parsing.result()
+            self.stdout.write(
+                f'{file_name}: разобрано {rows} строк за {seconds:.2f} с'
+            )
+        processed = sum(counts.values())
+        report = f'{counts["created"]} строк'
+        if options['upsert']:
+            report = (
+                f'создано {counts["created"]}, обновлено '
+                f'{counts["updated"]}, без изменений {counts["unchanged"]}'
+            )
+        self.stdout.write(
+            f'{file_name}: {report} за {elapsed:.2f} с '
+            f'({processed / max(elapsed, 1e-6):.0f} строк/с)'
+        )
+        return counts, touched
 
-conn = sqlite3.connect(os.path.join(settings.BASE_DIR, 'db.sqlite3'))
-cursor = conn.cursor()
-
-cursor.execute('''CREATE TABLE IF NOT EXISTS reviews_title_genre (
-                    id INTEGER,
-                    title_id INTEGER,
-                    genre_id INTEGER
-                )''')
-
-sq = ("INSERT INTO reviews_title_genre "
-      "(id, title_id, genre_id) VALUES (?, ?, ?)")
-with open(
-    os.path.join(FILES_PATH, 'genre_title.csv'), 'r',
-    newline='', encoding='utf-8'
-) as csv_file:
-    csv_reader = csv.reader(csv_file)
-    next(csv_reader)
-    for row in csv_reader:
-        cursor.execute(sq, row)
-conn.commit()
-conn.close()
+    def finalize(self, touched=None):
+        # bulk_create не вызывает save() и сигналы, поэтому рейтинги,
+        # счётчики комментариев и поисковый индекс пересчитываются один раз
+        # в конце, а версии кэша меняет сигнал bulk_written. После upsert -
+        # только для затронутых записей и таблиц.
+        if touched is None:
+            refresh_titles()
+            refresh_reviews()
+            models = IMPORT_MODELS.values()
+        else:
+            refresh_titles(
+                touched.get('review', ()), touched.get('titles', ())
+            )
+            refresh_reviews(touched.get('comments', ()))
+            models = [IMPORT_MODELS[file_name] for file_name in touched]
+        # id взяты из CSV: сдвигаем последовательности (PostgreSQL, Oracle).
+        reset_sequences(IMPORT_MODELS.values())
+        bulk_written.send(sender=type(self), models=models)
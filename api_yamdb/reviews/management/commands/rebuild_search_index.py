@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews import search
+
+
+class Command(BaseCommand):
+    """Команда для перестроения полнотекстового индекса произведений."""
+
+    help = 'Перестраивает полнотекстовый индекс произведений (SQLite FTS5).'
+
+    def handle(self, *args, **options):
+        if not search.is_enabled():
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite.'
+            )
+        count = search.rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано произведений: {count}.'))
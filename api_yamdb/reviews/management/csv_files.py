@@ -0,0 +1,94 @@
+"""Чтение CSV выгрузок.
+
+Модуль не обращается к Django, поэтому его функции можно выполнять
+в дочерних процессах пула при любом способе их запуска.
+"""
+import csv
+import gzip
+import os
+import time
+from itertools import islice
+
+# Сколько пачек строк файла может ждать записи в очереди.
+QUEUE_CHUNKS = 4
+
+
+def find_csv(files_path, file_name):
+    """Ищет файл ``<name>.csv`` или сжатый ``<name>.csv.gz``."""
+    for csv_file in (file_name + '.csv', file_name + '.csv.gz'):
+        csv_path = os.path.join(files_path, csv_file)
+        if os.path.exists(csv_path):
+            return csv_path
+    return None
+
+
+def open_csv(csv_path):
+    opener = gzip.open if csv_path.endswith('.gz') else open
+    return opener(csv_path, 'rt', encoding='utf-8', newline='')
+
+
+def chunked(rows, chunk_size):
+    """Разбивает поток строк на списки длиной не больше chunk_size."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def read_header(csv_path):
+    """Заголовок файла: читается только первая строка."""
+    with open_csv(csv_path) as csv_file:
+        return tuple(next(csv.reader(csv_file), ()))
+
+
+def checked_rows(reader):
+    """Строки файла; строка с неверным числом полей - ValueError."""
+    for row in reader:
+        if None in row or None in row.values():
+            raise ValueError(
+                f'строка {reader.line_num}: неверное число полей'
+            )
+        yield row
+
+
+def read_chunks(csv_path, chunk_size):
+    """Читает файл пачками проверенных строк-словарей."""
+    with open_csv(csv_path) as csv_file:
+        yield from chunked(checked_rows(csv.DictReader(csv_file)), chunk_size)
+
+
+def produce_chunks(csv_path, chunk_size, chunks):
+    """Разбирает файл в дочернем процессе и передаёт пачки в очередь.
+
+    Ошибка разбора передаётся строкой, конец файла - ``None``. Возвращает
+    число строк и время разбора без ожидания места в очереди.
+    """
+    rows, seconds = 0, 0.0
+    started = time.perf_counter()
+    try:
+        for chunk in read_chunks(csv_path, chunk_size):
+            seconds += time.perf_counter() - started
+            chunks.put(chunk)
+            rows += len(chunk)
+            started = time.perf_counter()
+    except (ValueError, csv.Error) as error:
+        chunks.put(str(error))
+    finally:
+        chunks.put(None)
+    return rows, seconds
+
+
+def consume_chunks(chunks):
+    """Пачки из очереди ``produce_chunks``; ошибка разбора - ValueError.
+
+    Если чтение прервано, очередь вычитывается до конца, чтобы дочерний
+    процесс не остался ждать места в ней.
+    """
+    chunk = None
+    try:
+        while (chunk := chunks.get()) is not None:
+            if isinstance(chunk, str):
+                raise ValueError(chunk)
+            yield chunk
+    finally:
+        while chunk is not None:
+            chunk = chunks.get()
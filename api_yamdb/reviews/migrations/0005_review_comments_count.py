@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:22
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comments_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.annotate(
+        amount=Count('comments')
+    ).filter(amount__gt=0)
+    for review in reviews.iterator():
+        review.comments_count = review.amount
+        review.save(update_fields=('comments_count',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
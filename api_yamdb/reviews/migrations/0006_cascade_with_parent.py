@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:33
+
+from django.conf import settings
+from django.db import migrations, models
+import reviews.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(on_delete=reviews.models.cascade_with_parent, related_name='comments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='review',
+            field=models.ForeignKey(on_delete=reviews.models.cascade_with_parent, related_name='comments', to='reviews.review'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='author',
+            field=models.ForeignKey(on_delete=reviews.models.cascade_with_parent, related_name='reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(on_delete=reviews.models.cascade_with_parent, related_name='reviews', to='reviews.title', verbose_name='Обзор'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
 
 from .validators import validate_username, validate_year
 
@@ -26,10 +28,21 @@ class BaseGroup(models.Model):
         return self.name[:settings.OUTPUT_LENGTH]
 
 
+def cascade_with_parent(collector, field, sub_objs, using):
+    """CASCADE, помечающий объекты, удаляемые вместе с родителем.
+
+    В ``deleted_with`` записывается имя поля связи: получатели сигналов
+    удаления по нему пропускают пересчёт счётчиков удаляемого родителя.
+    """
+    for obj in sub_objs:
+        obj.deleted_with = field.name
+    models.CASCADE(collector, field, sub_objs, using)
+
+
 class BasePublication(models.Model):
     author = models.ForeignKey(
         'User',
-        on_delete=models.CASCADE,
+        on_delete=cascade_with_parent,
     )
     text = models.TextField(verbose_name='Текст')
     pub_date = models.DateTimeField(
@@ -149,21 +162,96 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    score_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        null=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'произведение'
         default_related_name = 'titles'
         ordering = ('year', 'name',)
+        indexes = (
+            models.Index(
+                fields=('year', 'name', 'id'),
+                name='title_year_name_id_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name[:settings.OUTPUT_LENGTH]
 
+    @classmethod
+    def shift_rating(cls, title_id, score_delta, count_delta):
+        """Сдвигает сумму и количество оценок одним UPDATE."""
+        cls.shift_ratings(
+            cls.objects.filter(pk=title_id), score_delta, count_delta
+        )
+
+    @staticmethod
+    def shift_ratings(titles, score_delta, count_delta):
+        """Сдвигает рейтинги выбранных произведений одним UPDATE.
+
+        ``score_delta`` может быть выражением, например подзапросом по
+        строке произведения.
+        """
+        score_sum = F('score_sum') + score_delta
+        score_count = F('score_count') + count_delta
+        titles.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=Case(
+                When(score_count__lte=-count_delta, then=None),
+                default=score_sum / score_count,
+                output_field=models.PositiveSmallIntegerField(),
+            ),
+        )
+
+    @classmethod
+    def recount_ratings(cls, title_ids=None):
+        """Пересчитывает рейтинги произведений по их отзывам.
+
+        Нужен после массовой загрузки отзывов в обход ``Review.save()``.
+        Без ``title_ids`` пересчитываются все произведения.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        titles = cls.objects.all()
+        if title_ids is not None:
+            titles = titles.filter(pk__in=title_ids)
+        titles.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(sum=Sum('score')).values('sum')), 0
+            ),
+            score_count=Coalesce(
+                Subquery(reviews.annotate(count=Count('pk')).values('count')),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(
+                    rating=Sum('score') / Count('pk')
+                ).values('rating')
+            ),
+        )
+
 
 class Review(BasePublication):
     title = models.ForeignKey(
         Title,
-        on_delete=models.CASCADE,
+        on_delete=cascade_with_parent,
         verbose_name='Обзор',
     )
     score = models.SmallIntegerField(
@@ -179,6 +267,11 @@ class Review(BasePublication):
             ),
         ),
     )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta(BasePublication.Meta):
         verbose_name = 'Отзыв'
@@ -190,13 +283,96 @@ class Review(BasePublication):
             ),
         )
 
+    def locked_rating(self):
+        """Произведение и оценка отзыва в БД; None для нового.
+
+        Строка читается с блокировкой внутри транзакции записи, поэтому
+        одновременные изменения отзыва сдвигают рейтинг по очереди.
+        """
+        if self._state.adding:
+            return None
+        return type(self).objects.select_for_update().filter(
+            pk=self.pk
+        ).values_list('title_id', 'score').first()
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и переносит оценку в рейтинг произведения."""
+        with transaction.atomic():
+            stored_rating = self.locked_rating()
+            super().save(*args, **kwargs)
+            if stored_rating is None:
+                Title.shift_rating(self.title_id, self.score, 1)
+            elif stored_rating[0] != self.title_id:
+                Title.shift_rating(stored_rating[0], -stored_rating[1], -1)
+                Title.shift_rating(self.title_id, self.score, 1)
+            elif stored_rating[1] != self.score:
+                Title.shift_rating(
+                    self.title_id, self.score - stored_rating[1], 0
+                )
+
+    @classmethod
+    def shift_comments_count(cls, review_id, delta):
+        cls.objects.filter(pk=review_id).update(
+            comments_count=F('comments_count') + delta
+        )
+
+    @classmethod
+    def recount_comments(cls, review_ids=None):
+        """Пересчитывает число комментариев к отзывам.
+
+        Нужен после массовой записи комментариев в обход ``Comment.save()``.
+        Без ``review_ids`` пересчитываются все отзывы.
+        """
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        reviews = cls.objects.all()
+        if review_ids is not None:
+            reviews = reviews.filter(pk__in=review_ids)
+        reviews.update(comments_count=Coalesce(
+            Subquery(comments.annotate(count=Count('pk')).values('count')), 0
+        ))
+
 
 class Comment(BasePublication):
     review = models.ForeignKey(
         Review,
-        on_delete=models.CASCADE,
+        on_delete=cascade_with_parent,
     )
 
     class Meta(BasePublication.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'комментарий'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        comment = super().from_db(db, field_names, values)
+        # Чтение отложенного поля - это запрос и повторный вызов from_db.
+        if 'review_id' in comment.__dict__:
+            comment.stored_review_id = comment.review_id
+        return comment
+
+    def get_stored_review_id(self):
+        """Отзыв, в счётчике которого учтён комментарий; None для нового.
+
+        Если поле было отложено при загрузке, значение читается из БД.
+        """
+        stored_review_id = getattr(self, 'stored_review_id', None)
+        if stored_review_id is None and not self._state.adding:
+            stored_review_id = type(self).objects.filter(
+                pk=self.pk
+            ).values_list('review_id', flat=True).first()
+        return stored_review_id
+
+    def save(self, *args, **kwargs):
+        """Сохраняет комментарий и обновляет счётчик комментариев отзыва."""
+        stored_review_id = self.get_stored_review_id()
+        if stored_review_id == self.review_id:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if stored_review_id is not None:
+                Review.shift_comments_count(stored_review_id, -1)
+            Review.shift_comments_count(self.review_id, 1)
+        self.stored_review_id = self.review_id
@@ -0,0 +1,106 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+# Совпадение в названии весит больше, чем в описании.
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+NO_RANK = Value(0.0, output_field=FloatField())
+
+
+def is_enabled():
+    """Полнотекстовый индекс FTS5 есть только в SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def search_terms(text):
+    return re.findall(r'\w+', text)
+
+
+def match_expression(text):
+    """Превращает пользовательский ввод в безопасный запрос FTS5."""
+    return ' '.join(f'"{term}"*' for term in search_terms(text))
+
+
+def index_title(title):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (title.pk,)
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            (title.pk, title.name, title.description)
+        )
+
+
+def unindex_title(title_id):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (title_id,)
+        )
+
+
+def rebuild_index():
+    """Заново строит индекс по всем произведениям. Возвращает их число."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            'SELECT id, name, description FROM reviews_title'
+        )
+        return cursor.rowcount
+
+
+def reindex_titles(title_ids):
+    """Обновляет в индексе только перечисленные произведения."""
+    placeholders = ', '.join(['%s'] * len(title_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+            title_ids
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            'SELECT id, name, description FROM reviews_title '
+            f'WHERE id IN ({placeholders})',
+            title_ids
+        )
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по словам и добавляет аннотацию ``rank``.
+
+    Чем меньше ``rank``, тем выше релевантность (как у ``bm25``).
+    """
+    expression = match_expression(text)
+    if not expression:
+        return queryset.none().annotate(rank=NO_RANK)
+    if not is_enabled():
+        condition = Q()
+        for term in search_terms(text):
+            condition &= (
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset.filter(condition).annotate(rank=NO_RANK)
+    table = queryset.model._meta.db_table
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (expression,)
+        )
+    ).annotate(
+        rank=RawSQL(
+            f'SELECT bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}) '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = {table}.id',
+            (expression,)
+        )
+    )
@@ -0,0 +1,81 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from . import search
+from .models import Comment, Review, Title, User
+
+# Массовая запись в обход save() и сигналов моделей (import_csv,
+# generate_data). Аргумент models - модели, в таблицы которых шла запись.
+bulk_written = Signal()
+
+
+@receiver(pre_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    """Убирает оценку удаляемого отзыва из рейтинга произведения.
+
+    pre_delete выполняется в транзакции удаления, пока отзыв ещё в БД:
+    оценка читается здесь с блокировкой строки, а отложенный title_id
+    запоминается для сигналов после удаления. При каскаде с произведением
+    рейтинг не нужен, а оценки удаляемого пользователя вычитает
+    remove_user_scores.
+    """
+    if getattr(instance, 'deleted_with', None):
+        return
+    title_id, score = instance.locked_rating()
+    instance.title_id = title_id
+    Title.shift_rating(title_id, -score, -1)
+
+
+@receiver(pre_delete, sender=User)
+def remove_user_scores(sender, instance, **kwargs):
+    """Убирает оценки пользователя из рейтингов одним UPDATE.
+
+    Отзыв на произведение у пользователя один, поэтому каждое произведение
+    теряет одну оценку.
+    """
+    score = Review.objects.filter(
+        author=instance, title=OuterRef('pk')
+    ).values('score')
+    Title.shift_ratings(
+        Title.objects.filter(reviews__author=instance), -Subquery(score), -1
+    )
+
+
+@receiver(pre_delete, sender=Comment)
+def remove_comment(sender, instance, **kwargs):
+    """Вычитает удаляемый комментарий из счётчика комментариев отзыва.
+
+    Как и в remove_review_score, отложенное поле дочитывается до удаления.
+    При каскаде с отзывом счётчик не нужен, а комментарии удаляемого
+    пользователя вычитает remove_user_comments.
+    """
+    if not hasattr(instance, 'stored_review_id'):
+        instance.refresh_from_db(fields=('review',))
+        instance.stored_review_id = instance.review_id
+    if getattr(instance, 'deleted_with', None):
+        return
+    Review.shift_comments_count(instance.stored_review_id, -1)
+
+
+@receiver(pre_delete, sender=User)
+def remove_user_comments(sender, instance, **kwargs):
+    """Вычитает комментарии пользователя из счётчиков отзывов одним UPDATE."""
+    comments = Comment.objects.filter(
+        author=instance, review=OuterRef('pk')
+    ).order_by().values('review').annotate(count=Count('pk')).values('count')
+    Review.objects.filter(comments__author=instance).update(
+        comments_count=F('comments_count') - Subquery(comments)
+    )
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    """Обновляет запись произведения в полнотекстовом индексе."""
+    search.index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    """Убирает удалённое произведение из полнотекстового индекса."""
+    search.unindex_title(instance.pk)
@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings, tmp_path_factory):
+    """Отдельный файловый кэш теста; кэш сервера разработки не трогается."""
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path_factory.mktemp('cache')),
+    }}
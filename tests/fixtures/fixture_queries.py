@@ -0,0 +1,60 @@
+from collections import Counter
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.duplicates import statement_shape
+
+# Сколько самых частых повторяющихся запросов показывать в отчёте.
+REPORTED_STATEMENTS = 3
+
+
+class QueryBudget:
+    """Число SQL-запросов одного действия при разных объёмах данных."""
+
+    def __init__(self):
+        self.captured = {}
+
+    def measure(self, size, request):
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = request()
+        self.captured[size] = captured.captured_queries
+        return response
+
+    def report(self, name, budget):
+        counts = ', '.join(
+            f'{size} объект(ов) - {len(queries)}'
+            for size, queries in self.captured.items()
+        )
+        shapes = Counter(
+            statement_shape(query['sql'])
+            for query in self.captured[max(self.captured)]
+        )
+        repeated = '\n'.join(
+            f'  {amount} раз(а): {sql}'
+            for sql, amount in shapes.most_common(REPORTED_STATEMENTS)
+            if amount > 1
+        )
+        return (
+            f'`{name}`: бюджет {budget} SQL-запросов; выполнено: {counts}.'
+            + (f'\nПовторяющиеся запросы:\n{repeated}' if repeated else '')
+        )
+
+    def check(self, name, budget):
+        counts = [len(queries) for queries in self.captured.values()]
+        assert len(set(counts)) == 1, (
+            'Проверьте, что число запросов к БД не растёт вместе с объёмом '
+            'данных (N+1). ' + self.report(name, budget)
+        )
+        assert counts[0] <= budget, (
+            'Проверьте, что число запросов к БД не превышает бюджет. '
+            + self.report(name, budget)
+        )
+
+
+@pytest.fixture
+def query_budget():
+    return QueryBudget()
@@ -366,3 +366,36 @@ class Test06CommentAPI:
             f'Проверьте, что PUT-запрос к `{self.COMMENT_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_08_comments_of_review_under_other_title(
+            self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        kwargs = dict(title_id=titles[1]['id'], review_id=reviews[0]['id'])
+        responses = {
+            'GET-запрос списка': admin_client.get(
+                self.COMMENTS_URL_TEMPLATE.format(**kwargs)
+            ),
+            'POST-запрос': user_client.post(
+                self.COMMENTS_URL_TEMPLATE.format(**kwargs),
+                data={'text': 'Не к тому произведению'}
+            ),
+            'GET-запрос': admin_client.get(
+                self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                    comment_id=comments[0]['id'], **kwargs
+                )
+            ),
+            'PATCH-запрос': admin_client.patch(
+                self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                    comment_id=comments[0]['id'], **kwargs
+                ),
+                data={'text': 'Новый текст'}
+            ),
+        }
+        for request_name, response in responses.items():
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что {request_name} к комментариям отзыва, '
+                'указанного вместе с чужим `title_id`, возвращает ответ со '
+                'статусом 404.'
+            )
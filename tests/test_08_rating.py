@@ -0,0 +1,159 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 10, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что рейтинг произведения сбрасывается, когда '
+            'удалены все его отзывы.'
+        )
+
+    def test_02_duplicate_review_keeps_rating(self, client, admin_client,
+                                              admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        response = admin_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            data={'text': 'Ещё раз', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST and (
+            response.json() == {
+                'non_field_errors': [
+                    'Вы уже оставили отзыв на это произведение'
+                ]
+            }
+        ), (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400 и сообщением об ошибке.'
+        )
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что отклонённый повторный отзыв не меняет рейтинг '
+            'произведения.'
+        )
+
+    def test_03_deferred_fields(self, client, admin_client, admin,
+                                user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        assert len(Review.objects.only('id', 'text')) == 2 and len(
+            Review.objects.defer('title')
+        ) == 2, (
+            'Проверьте, что отзывы загружаются с отложенными полями '
+            '`title` и `score`.'
+        )
+        review = Review.objects.only('id').get(pk=reviews[0]['id'])
+        review.score = 9
+        review.save()
+        assert self.get_rating(client, titles[0]['id']) == 7, (
+            'Проверьте, что рейтинг пересчитывается при сохранении отзыва, '
+            'загруженного с отложенными полями.'
+        )
+        Review.objects.only('id').get(pk=reviews[0]['id']).delete()
+        assert self.get_rating(client, titles[0]['id']) == 5, (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва, '
+            'загруженного с отложенными полями.'
+        )
+
+    def test_04_user_with_many_reviews_deleted(self, client, admin_client,
+                                               admin, user_client, user):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        for title in titles[:2]:
+            create_single_review(user_client, title['id'], 'Текст', 1)
+        user.delete()
+        assert [
+            self.get_rating(client, title['id']) for title in titles[:2]
+        ] == [5, None], (
+            'Проверьте, что при удалении пользователя его оценки убираются '
+            'из рейтингов всех произведений.'
+        )
+
+    def test_05_stale_instances(self, client, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        first, second = (
+            Review.objects.get(pk=reviews[0]['id']) for _ in range(2)
+        )
+        first.score = 7
+        first.save()
+        second.score = 3
+        second.save()
+        assert self.get_rating(client, titles[0]['id']) == 3, (
+            'Проверьте, что рейтинг считается от оценки в БД, а не от '
+            'оценки, загруженной до изменения отзыва другим запросом.'
+        )
+        first.delete()
+        assert self.get_rating(client, titles[0]['id']) is None
+        assert Title.objects.get(pk=titles[0]['id']).score_sum == 0
+
+    def test_06_other_integrity_errors(self, client, admin_client,
+                                       monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+
+        def broken_rating(*args):
+            raise IntegrityError('CHECK constraint failed: score_count')
+
+        monkeypatch.setattr(Title, 'shift_rating', broken_rating)
+        with pytest.raises(IntegrityError):
+            admin_client.post(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+                data={'text': 'Первый отзыв', 'score': 5}
+            )
+        assert not Review.objects.exists(), (
+            'Проверьте, что ошибка целостности, не связанная с повторным '
+            'отзывом, не превращается в ответ 400 о повторном отзыве.'
+        )
@@ -0,0 +1,84 @@
+import pytest
+
+from tests.utils import (
+    create_comments, create_reviews, create_single_comment,
+    create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_titles_list_queries(self, client, admin_client,
+                                    django_assert_num_queries):
+        _, categories, genres = create_titles(admin_client)
+        with django_assert_num_queries(3):
+            client.get(self.TITLES_URL)
+        for year in range(1990, 1995):
+            admin_client.post(self.TITLES_URL, data={
+                'name': f'Терминатор {year}',
+                'year': year,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[0]['slug'],
+            })
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == 5, (
+            'Проверьте, что число запросов к БД при получении списка '
+            f'`{self.TITLES_URL}` не зависит от размера страницы.'
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(2):
+            client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            )
+
+    def test_03_reviews_list_queries(self, client, admin_client,
+                                     moderator_client, user_client, admin,
+                                     moderator, user,
+                                     django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with django_assert_num_queries(3):
+            client.get(url)
+        for author_client in (moderator_client, user_client):
+            create_single_review(author_client, titles[0]['id'], 'Текст', 4)
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == 3, (
+            'Проверьте, что число запросов к БД при получении списка '
+            'отзывов не зависит от числа авторов на странице.'
+        )
+
+    def test_04_comments_list_queries(self, client, admin_client,
+                                      moderator_client, user_client, admin,
+                                      moderator, user,
+                                      django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        with django_assert_num_queries(3):
+            client.get(url)
+        for author_client in (moderator_client, user_client):
+            create_single_comment(
+                author_client, titles[0]['id'], reviews[0]['id'], 'Текст'
+            )
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == 3, (
+            'Проверьте, что число запросов к БД при получении списка '
+            'комментариев не зависит от числа авторов на странице.'
+        )
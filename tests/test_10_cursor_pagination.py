@@ -0,0 +1,73 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleCursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_cursor_walk(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        for idx in range(12):
+            admin_client.post(self.TITLES_URL, data={
+                'name': f'Произведение {idx % 3}',
+                'year': 1980 + idx % 4,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            })
+
+        response = client.get(self.TITLES_URL, {'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора не выполняется подсчёт записей.'
+        )
+        assert data['previous'] is None
+        pages = [data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append(data['results'])
+        seen = [
+            (title['year'], title['name'], title['id'])
+            for page in pages for title in page
+        ]
+        assert len(seen) == 12 and seen == sorted(seen), (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` отдаёт все '
+            'произведения ровно один раз в порядке (year, name, id).'
+        )
+
+        previous = client.get(data['previous']).json()
+        assert previous['results'] == pages[-2], (
+            'Проверьте, что ссылка `previous` в режиме курсора ведёт на '
+            'предыдущую страницу.'
+        )
+
+    def test_02_invalid_cursor(self, client):
+        response = client.get(self.TITLES_URL, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        for position in (['abc', 'x', 1], [2000, 1, 1], [2000, 'x', True]):
+            token = base64.urlsafe_b64encode(
+                json.dumps({'p': position, 'r': 0}).encode()
+            ).decode()
+            response = client.get(self.TITLES_URL, {'cursor': token})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что курсор с позицией неверного типа '
+                f'{position} отклоняется ответом 404.'
+            )
+
+    def test_03_cursor_keeps_its_order(self, client):
+        for params in ({'ordering': '-year'}, {'search': 'фильм'}):
+            response = client.get(self.TITLES_URL, {'cursor': '', **params})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что курсор вместе с параметром '
+                f'{", ".join(params)} отклоняется ответом 400.'
+            )
+        response = client.get(self.TITLES_URL, {'cursor': '', 'search': ''})
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.search(client, 'терминат') == [titles[0]['id']], (
+            'Проверьте, что параметр `search` ищет произведения по началу '
+            'слова в названии.'
+        )
+        assert self.search(client, 'yippie') == [titles[1]['id']], (
+            'Проверьте, что параметр `search` ищет произведения по описанию.'
+        )
+        assert self.search(client, '"') == []
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'name': 'Чужой'}
+        )
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'чужой') == [titles[0]['id']]
+        admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert self.search(client, 'чужой') == []
+
+    def test_03_relevance_and_rebuild(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'description': 'Крепкий орешек для терминатора'}
+        )
+        assert self.search(client, 'крепкий') == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше, чем '
+            'совпадение в описании.'
+        )
+        call_command('rebuild_search_index', verbosity=0)
+        assert self.search(client, 'крепкий') == [
+            titles[1]['id'], titles[0]['id']
+        ]
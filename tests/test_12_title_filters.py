@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def filter_ids(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['id'] for title in response.json()['results'])
+
+    def test_01_several_genres(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        both = sorted(title['id'] for title in titles)
+        assert self.filter_ids(client, {'genre': 'comedy,drama'}) == both, (
+            'Проверьте, что `genre=a,b` отбирает произведения хотя бы с '
+            'одним из перечисленных жанров.'
+        )
+        assert self.filter_ids(
+            client, {'genre': 'comedy,horror', 'genre_mode': 'all'}
+        ) == [titles[0]['id']], (
+            'Проверьте, что `genre_mode=all` отбирает произведения со всеми '
+            'перечисленными жанрами.'
+        )
+        assert self.filter_ids(
+            client, {'genre': 'comedy,drama', 'genre_mode': 'all'}
+        ) == []
+        assert self.filter_ids(client, {'genre': 'unknown'}) == []
+
+    def test_02_category_and_genre(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.filter_ids(
+            client, {'genre': 'drama', 'category': 'books'}
+        ) == [titles[1]['id']]
+        assert self.filter_ids(
+            client, {'genre': 'drama', 'category': 'films'}
+        ) == []
+        assert self.filter_ids(client, {'category': 'unknown'}) == []
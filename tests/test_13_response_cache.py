@@ -0,0 +1,76 @@
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    CACHE_STATS_URL = '/api/v1/titles/cache-stats/'
+
+    def test_01_hit_and_invalidation(self, client, admin_client, user_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url)['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET-запрос к произведению отдаётся '
+            'из кэша без запросов к БД.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений.'
+        )
+
+    def test_02_params_are_normalized(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL, {'year': 1984, 'genre': 'horror'})
+        response = client.get(f'{self.TITLES_URL}?genre=horror&year=1984')
+        assert response['X-Cache'] == 'HIT'
+
+    def test_03_cache_stats(self, client, admin_client, user_client,
+                            registry):
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        response = user_client.get(self.CACHE_STATS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(self.CACHE_STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'hits': 1, 'misses': 1}
+
+    def test_04_process_local_cache_is_not_used(self, client, admin_client,
+                                                settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert 'X-Cache' not in response, (
+            'Проверьте, что с локальным для процесса кэшем ответы '
+            'произведений не кэшируются: другие воркеры не узнают о записи.'
+        )
+
+    def test_05_hit_writes_nothing(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        cache_dir = Path(settings.CACHES['default']['LOCATION'])
+        files = {path: path.stat().st_mtime_ns for path in cache_dir.iterdir()}
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'HIT'
+        assert {
+            path: path.stat().st_mtime_ns for path in cache_dir.iterdir()
+        } == files, (
+            'Проверьте, что ответ из кэша ничего не записывает в кэш.'
+        )
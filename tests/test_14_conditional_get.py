@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    CATEGORIES_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def assert_not_modified(self, client, url, django_assert_num_queries):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'
+        ), f'Проверьте, что ответ `{url}` содержит ETag и Last-Modified.'
+        with django_assert_num_queries(0):
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            'If-None-Match возвращает 304 без запросов к БД.'
+        )
+        return response['ETag']
+
+    def test_01_read_endpoints(self, client, admin_client,
+                               django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for url in (
+            self.TITLES_URL,
+            self.CATEGORIES_URL,
+            self.GENRES_URL,
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+        ):
+            self.assert_not_modified(client, url, django_assert_num_queries)
+
+    def test_02_etag_changes_on_write(self, client, admin_client, admin,
+                                      django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = self.assert_not_modified(
+            client, url, django_assert_num_queries
+        )
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'score': 9})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения отзыва ETag списка отзывов '
+            'меняется.'
+        )
+        response = client.get(
+            self.TITLES_URL, {'year': 1984}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_no_etag_with_process_local_cache(self, client, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        response = client.get(self.GENRES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('ETag'), (
+            'Проверьте, что с локальным для процесса кэшем ETag не '
+            'выдаётся: версии ресурсов других воркеров могут отличаться.'
+        )
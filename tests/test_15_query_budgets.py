@@ -0,0 +1,185 @@
+import pytest
+from django.conf import settings
+
+from api.management.commands.benchmark import fill
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+# Объёмы данных, на которых сравнивается число запросов:
+# один объект и полная страница.
+SIZES = (1, settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+# Клиент, метод, адрес, тело запроса и наибольшее допустимое число
+# SQL-запросов для каждого действия. В адресах и телах подставляются
+# значения из набора данных, созданного create_dataset.
+QUERY_BUDGETS = {
+    'titles-list': ('client', 'get', '/api/v1/titles/', None, 3),
+    'titles-detail': (
+        'client', 'get', '/api/v1/titles/{title_id}/', None, 2
+    ),
+    'titles-create': (
+        'admin_client', 'post', '/api/v1/titles/',
+        {'name': '{prefix} title', 'year': 2000, 'genre': ['{genre}'],
+         'category': '{category}'},
+        11,
+    ),
+    'titles-partial-update': (
+        'admin_client', 'patch', '/api/v1/titles/{title_id}/',
+        {'name': '{prefix} renamed'}, 7,
+    ),
+    'titles-destroy': (
+        'admin_client', 'delete', '/api/v1/titles/{title_id}/', None, 11
+    ),
+    'categories-list': ('client', 'get', '/api/v1/categories/', None, 2),
+    'categories-create': (
+        'admin_client', 'post', '/api/v1/categories/',
+        {'name': '{prefix} new', 'slug': '{prefix}-new'}, 3,
+    ),
+    'categories-destroy': (
+        'admin_client', 'delete', '/api/v1/categories/{category}/', None, 6
+    ),
+    'genres-list': ('client', 'get', '/api/v1/genres/', None, 2),
+    'genres-create': (
+        'admin_client', 'post', '/api/v1/genres/',
+        {'name': '{prefix} new', 'slug': '{prefix}-new'}, 3,
+    ),
+    'genres-destroy': (
+        'admin_client', 'delete', '/api/v1/genres/{genre}/', None, 5
+    ),
+    'reviews-list': (
+        'client', 'get', '/api/v1/titles/{title_id}/reviews/', None, 3
+    ),
+    'reviews-detail': (
+        'client', 'get', '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        None, 1,
+    ),
+    'reviews-create': (
+        'user_client', 'post', '/api/v1/titles/{title_id}/reviews/',
+        {'text': 'Отзыв', 'score': 7}, 5,
+    ),
+    'reviews-partial-update': (
+        'admin_client', 'patch',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/', {'score': 7}, 6,
+    ),
+    'reviews-destroy': (
+        'admin_client', 'delete',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/', None, 8,
+    ),
+    'comments-list': (
+        'client', 'get',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/', None, 3,
+    ),
+    'comments-detail': (
+        'client', 'get',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+        None, 1,
+    ),
+    'comments-create': (
+        'user_client', 'post',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        {'text': 'Комментарий'}, 5,
+    ),
+    'comments-partial-update': (
+        'admin_client', 'patch',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+        {'text': 'Новый текст'}, 3,
+    ),
+    'comments-destroy': (
+        'admin_client', 'delete',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+        None, 5,
+    ),
+    'users-list': ('admin_client', 'get', '/api/v1/users/', None, 3),
+    'users-detail': (
+        'admin_client', 'get', '/api/v1/users/{username}/', None, 2
+    ),
+    'users-create': (
+        'admin_client', 'post', '/api/v1/users/',
+        {'username': '{prefix}-new', 'email': '{prefix}-new@yamdb.fake'},
+        4,
+    ),
+    'users-partial-update': (
+        'admin_client', 'patch', '/api/v1/users/{username}/',
+        {'bio': 'Новое описание'}, 3,
+    ),
+    'users-destroy': (
+        'admin_client', 'delete', '/api/v1/users/{username}/', None, 14
+    ),
+    'me-detail': ('user_client', 'get', '/api/v1/users/me/', None, 1),
+    'me-partial-update': (
+        'user_client', 'patch', '/api/v1/users/me/',
+        {'bio': 'Новое описание'}, 2,
+    ),
+}
+
+
+def create_dataset(prefix, size):
+    """По size категорий, жанров, произведений, пользователей, отзывов на
+    первое произведение и комментариев к первому отзыву."""
+    categories, genres = (
+        [
+            model_class.objects.create(
+                name=f'{prefix} {idx}', slug=f'{prefix}-{idx}'
+            )
+            for idx in range(size)
+        ]
+        for model_class in (Category, Genre)
+    )
+    titles = []
+    for idx in range(size):
+        title = Title.objects.create(
+            name=f'{prefix} {idx}', year=2000, category=categories[idx]
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    users = [
+        User.objects.create_user(
+            username=f'{prefix}-{idx}', email=f'{prefix}-{idx}@yamdb.fake'
+        )
+        for idx in range(size)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=idx + 1
+        )
+        for idx, author in enumerate(users)
+    ]
+    comments = [
+        Comment.objects.create(
+            review=reviews[0], author=author, text='Комментарий'
+        )
+        for author in users
+    ]
+    return dict(
+        prefix=prefix,
+        category=categories[0].slug,
+        genre=genres[0].slug,
+        title_id=titles[0].pk,
+        review_id=reviews[0].pk,
+        comment_id=comments[0].pk,
+        username=users[0].username,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15QueryBudgets:
+
+    @pytest.mark.parametrize('name', QUERY_BUDGETS)
+    def test_01_query_budget(self, name, request, query_budget):
+        client_name, method, url, data, budget = QUERY_BUDGETS[name]
+        client = request.getfixturevalue(client_name)
+        for size in SIZES:
+            context = create_dataset(f'size{size}', size)
+            response = query_budget.measure(
+                size,
+                lambda: getattr(client, method)(
+                    fill(url, context), data=fill(data, context)
+                ),
+            )
+            assert response.status_code < 400, (
+                f'`{name}`: запрос `{method.upper()} {fill(url, context)}` '
+                f'вернул статус {response.status_code}.'
+            )
+        query_budget.check(name, budget)
@@ -0,0 +1,60 @@
+import json
+import re
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ServerTiming:
+
+    TITLES_URL = '/api/v1/titles/'
+    PHASES = ('db', 'auth', 'serialization', 'render', 'total')
+
+    def test_01_server_timing_header(self, admin_client, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        create_titles(admin_client)
+        response = admin_client.get(self.TITLES_URL)
+        assert response.has_header('Server-Timing'), (
+            'Проверьте, что при SERVER_TIMING_SAMPLE_RATE = 1 ответ содержит '
+            'заголовок `Server-Timing`.'
+        )
+        durations = dict(re.findall(
+            r'(\w+);dur=([\d.]+)', response['Server-Timing']
+        ))
+        assert set(durations) == set(self.PHASES), (
+            'Проверьте, что заголовок `Server-Timing` содержит фазы '
+            f'{", ".join(self.PHASES)}.'
+        )
+        assert sum(
+            float(durations[name]) for name in self.PHASES[:-1]
+        ) <= float(durations['total']) + 0.01, (
+            'Проверьте, что фазы не пересекаются и в сумме не больше total.'
+        )
+
+    def test_02_structured_log(self, client, settings, caplog):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        with caplog.at_level('INFO', logger='api.timing'):
+            client.get(self.TITLES_URL)
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'titles-list' and record['status'] == 200, (
+            'Проверьте, что в лог пишется JSON-строка с именем '
+            'представления и статусом ответа.'
+        )
+        assert record['queries'] > 0 and 'db_ms' in record, (
+            'Проверьте, что строка лога содержит число SQL-запросов и '
+            'длительности фаз.'
+        )
+
+    def test_03_sampling_disabled(self, client, settings, caplog):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        with caplog.at_level('INFO', logger='api.timing'):
+            response = client.get(self.TITLES_URL)
+        assert not response.has_header('Server-Timing') and not [
+            record for record in caplog.records
+            if record.name == 'api.timing'
+        ], (
+            'Проверьте, что при SERVER_TIMING_SAMPLE_RATE = 0 запросы не '
+            'замеряются.'
+        )
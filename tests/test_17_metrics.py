@@ -0,0 +1,147 @@
+import json
+import subprocess
+import sys
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from api import metrics
+
+
+def metric_value(content, line_start):
+    for line in content.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Metrics:
+
+    TITLES_URL = '/api/v1/titles/'
+    METRICS_URL = '/metrics'
+    METRICS_TOKEN = 'secret'
+
+    @pytest.fixture(autouse=True)
+    def metrics_token(self, settings):
+        settings.METRICS_TOKEN = self.METRICS_TOKEN
+
+    def get_metrics(self, client):
+        return client.get(
+            self.METRICS_URL,
+            HTTP_AUTHORIZATION=f'Bearer {self.METRICS_TOKEN}',
+        ).content.decode()
+
+    def test_01_metrics_per_action(self, client, registry, settings):
+        settings.METRICS_DIR = None
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        client.post('/api/v1/auth/token/', data={})
+        content = self.get_metrics(client)
+        view = 'view="TitleViewSet.list"'
+        assert metric_value(
+            content, f'api_requests_total{{{view}}}'
+        ) == 2, (
+            f'Проверьте, что `{self.METRICS_URL}` считает запросы по '
+            'действиям вьюсетов.'
+        )
+        assert metric_value(
+            content, f'api_cache_hits_total{{{view}}}'
+        ) == 1 and metric_value(
+            content, f'api_cache_misses_total{{{view}}}'
+        ) == 1, 'Проверьте, что считаются попадания и промахи кэша.'
+        assert metric_value(
+            content, f'api_request_duration_seconds_count{{{view}}}'
+        ) == 2, 'Проверьте, что для действия ведётся гистограмма времени.'
+        assert metric_value(
+            content,
+            f'api_request_duration_quantile_seconds{{{view},quantile="0.99"}}'
+        ) is not None, 'Проверьте, что отдаются квантили p50/p95/p99.'
+        assert metric_value(
+            content, 'api_requests_total{view="TokenView.post"}'
+        ) == 1, 'Проверьте, что метрики собираются и для APIView.'
+
+    def test_02_metrics_from_all_workers(self, client, registry, settings,
+                                         tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        other_worker = metrics.Registry()
+        other_worker.observe('TitleViewSet.list', 0.2, 3, 500)
+        other_worker.flush(str(tmp_path))
+        client.get(self.TITLES_URL)
+        content = self.get_metrics(client)
+        view = 'view="TitleViewSet.list"'
+        assert metric_value(
+            content, f'api_requests_total{{{view}}}'
+        ) == 2, (
+            'Проверьте, что при заданном METRICS_DIR метрики суммируются '
+            'по файлам всех воркеров.'
+        )
+        assert metric_value(
+            content, f'api_errors_total{{{view}}}'
+        ) == 1, 'Проверьте, что ответы 5xx считаются как ошибки.'
+        assert (tmp_path / registry.own_file()).exists(), (
+            'Проверьте, что воркер сохраняет свои метрики в METRICS_DIR.'
+        )
+
+    def test_03_access(self, client, settings):
+        assert client.get(
+            self.METRICS_URL, HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.METRICS_URL}` без верного токена '
+            'отвечает 403.'
+        )
+        assert client.get(self.METRICS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        settings.METRICS_TOKEN = None
+        assert client.get(
+            self.METRICS_URL, HTTP_AUTHORIZATION='Bearer None'
+        ).status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что без METRICS_TOKEN `{self.METRICS_URL}` '
+            'отключён.'
+        )
+
+    def test_04_stale_worker_files(self, client, registry, settings,
+                                   tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        finished = subprocess.Popen((sys.executable, '-c', ''))
+        finished.wait()
+        dead_worker = metrics.Registry()
+        dead_worker.observe('TitleViewSet.list', 0.2, 3, 200)
+        dead_file = f'{finished.pid}-{"0" * 32}.json'
+        (tmp_path / dead_file).write_text(
+            json.dumps(dead_worker.snapshot())
+        )
+        view = 'view="TitleViewSet.list"'
+        for requests in (1, 2):
+            client.get(self.TITLES_URL)
+            assert metric_value(
+                self.get_metrics(client), f'api_requests_total{{{view}}}'
+            ) == requests + 1, (
+                'Проверьте, что метрики завершившегося воркера остаются '
+                'в сумме.'
+            )
+        assert not (tmp_path / dead_file).exists(), (
+            'Проверьте, что файл метрик завершившегося воркера удаляется.'
+        )
+        assert (tmp_path / metrics.RETIRED_FILE).exists()
+
+    def test_05_finished_threads(self, registry):
+        for _ in range(10):
+            thread = threading.Thread(
+                target=registry.observe,
+                args=('TitleViewSet.list', 0.2, 3, 200),
+            )
+            thread.start()
+            thread.join()
+        registry.observe('TitleViewSet.list', 0.2, 3, 200)
+        assert len(registry.shards) == 1, (
+            'Проверьте, что метрики завершившихся потоков складываются в '
+            'общий набор, а не копятся по потокам.'
+        )
+        snapshot = registry.snapshot()
+        assert snapshot['counters']['requests']['TitleViewSet.list'] == 11
+        assert snapshot['histograms']['TitleViewSet.list'][-1] == (
+            pytest.approx(2.2)
+        )
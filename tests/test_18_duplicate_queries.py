@@ -0,0 +1,66 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from api.duplicates import (
+    DuplicateQueriesError, DuplicateQueryMiddleware, statement_shape
+)
+from reviews.models import User
+
+
+def lookup_users(amount):
+    def view(request):
+        for pk in range(amount):
+            User.objects.filter(pk=pk).first()
+        return HttpResponse()
+    return view
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18DuplicateQueries:
+
+    URL = '/api/v1/titles/'
+
+    def call(self, amount):
+        middleware = DuplicateQueryMiddleware(lookup_users(amount))
+        return middleware(RequestFactory().get(self.URL))
+
+    def test_01_statement_shape(self):
+        assert statement_shape(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'a\''
+        ) == statement_shape(
+            'SELECT * FROM t WHERE id IN (%s) AND name = \'b\''
+        ), (
+            'Проверьте, что запросы, отличающиеся только литералами и '
+            'длиной списка IN, считаются одинаковыми.'
+        )
+
+    def test_02_header_mode(self, settings):
+        settings.DUPLICATE_QUERY_MODE = 'header'
+        settings.DUPLICATE_QUERY_THRESHOLD = 3
+        assert not self.call(2).has_header('X-Duplicate-Queries'), (
+            'Проверьте, что повторы ниже порога не отмечаются.'
+        )
+        header = self.call(4)['X-Duplicate-Queries']
+        assert header.startswith('4x ') and __file__ in header, (
+            'Проверьте, что заголовок `X-Duplicate-Queries` содержит число '
+            'повторов и место в коде, откуда вызваны запросы.'
+        )
+
+    def test_03_log_and_raise_modes(self, settings, caplog):
+        settings.DUPLICATE_QUERY_MODE = 'log'
+        settings.DUPLICATE_QUERY_THRESHOLD = 3
+        with caplog.at_level('WARNING', logger='api.duplicates'):
+            response = self.call(3)
+        assert not response.has_header('X-Duplicate-Queries') and (
+            f'GET {self.URL}' in caplog.text and '3 раз(а)' in caplog.text
+        ), 'Проверьте, что в режиме log повторы пишутся в лог.'
+        settings.DUPLICATE_QUERY_MODE = 'raise'
+        with pytest.raises(DuplicateQueriesError):
+            self.call(3)
+
+    def test_04_disabled(self, settings):
+        settings.DUPLICATE_QUERY_MODE = None
+        assert not self.call(10).has_header('X-Duplicate-Queries'), (
+            'Проверьте, что по умолчанию проверка выключена.'
+        )
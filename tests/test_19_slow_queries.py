@@ -0,0 +1,93 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def slow_query_log(tmp_path, settings, monkeypatch):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    path = tmp_path / 'slow_queries.log'
+    handler = logging.FileHandler(path, encoding='utf-8', delay=True)
+    monkeypatch.setattr(
+        logging.getLogger('api.slow_queries'), 'handlers', [handler]
+    )
+    yield path
+    handler.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SlowQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_slow_queries_logged(self, client, admin_client,
+                                    slow_query_log):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL, {'genre': 'comedy'})
+        records = [
+            json.loads(line)
+            for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+        ]
+        records = [
+            record for record in records
+            if record['view'] == 'TitleViewSet.list'
+        ]
+        assert records, (
+            'Проверьте, что запросы дольше SLOW_QUERY_THRESHOLD_MS пишутся '
+            'в журнал вместе с действием API.'
+        )
+        assert all(
+            record['plan'] and 'params' in record for record in records
+        ), (
+            'Проверьте, что для медленного запроса сохраняются параметры '
+            'и план EXPLAIN QUERY PLAN.'
+        )
+
+    def test_02_summary_command(self, client, admin_client, slow_query_log):
+        create_titles(admin_client)
+        slow_query_log.write_text('')
+        for _ in range(3):
+            client.get(self.TITLES_URL)
+        output = StringIO()
+        call_command(
+            'slow_queries', log=str(slow_query_log), order='count',
+            limit=1, stdout=output,
+        )
+        output = output.getvalue()
+        assert output.count('запрос: ') == 1 and 'TitleViewSet.list' in (
+            output
+        ), (
+            'Проверьте, что команда `slow_queries` группирует журнал по '
+            'видам запросов и ограничивает вывод параметром --limit.'
+        )
+
+    def test_03_disabled(self, client, slow_query_log, settings):
+        settings.SLOW_QUERY_THRESHOLD_MS = None
+        client.get(self.TITLES_URL)
+        assert not slow_query_log.exists(), (
+            'Проверьте, что при SLOW_QUERY_THRESHOLD_MS = None запросы не '
+            'записываются.'
+        )
+
+    def test_04_explain_not_counted(self, client, admin_client, registry,
+                                    slow_query_log, settings):
+        create_titles(admin_client)
+        view = 'TitleViewSet.list'
+        queries = []
+        for threshold, name in ((None, 'first'), (0, 'second')):
+            settings.SLOW_QUERY_THRESHOLD_MS = threshold
+            before = registry.snapshot()['counters']['db_queries'][view]
+            client.get(self.TITLES_URL, {'name': name})
+            queries.append(
+                registry.snapshot()['counters']['db_queries'][view] - before
+            )
+        assert slow_query_log.exists()
+        assert queries[0] == queries[1], (
+            'Проверьте, что EXPLAIN QUERY PLAN для журнала медленных '
+            'запросов не учитывается в числе SQL-запросов действия.'
+        )
@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Profiling:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_admin_profiles_request(self, admin_client, settings,
+                                       tmp_path):
+        settings.PROFILE_DIR = tmp_path
+        response = admin_client.get(self.TITLES_URL, HTTP_X_PROFILE='1')
+        assert response.has_header('X-Profile'), (
+            'Проверьте, что запрос администратора с заголовком `X-Profile: 1` '
+            'профилируется и ответ содержит имя файла профиля.'
+        )
+        profile = tmp_path / response['X-Profile']
+        summary = profile.with_suffix('.txt').read_text(encoding='utf-8')
+        assert profile.exists() and 'cumulative' in summary, (
+            'Проверьте, что профиль и сводка по кумулятивному времени '
+            'сохраняются в PROFILE_DIR.'
+        )
+        response = admin_client.get(self.TITLES_URL, {'profile': '1'})
+        assert response.has_header('X-Profile'), (
+            'Проверьте, что профилирование включается и параметром '
+            '`?profile=1`.'
+        )
+
+    def test_02_only_admin_can_profile(self, client, user_client, settings,
+                                       tmp_path):
+        settings.PROFILE_DIR = tmp_path
+        for request_client in (client, user_client):
+            response = request_client.get(
+                self.TITLES_URL, HTTP_X_PROFILE='1'
+            )
+            assert response.status_code == 200 and not response.has_header(
+                'X-Profile'
+            ), 'Проверьте, что профилировать запросы может только админ.'
+        assert not list(tmp_path.iterdir())
@@ -0,0 +1,80 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.management.commands.replay_load import COLLECTION_PATH
+from api.management.postman import is_error, load_collection
+
+
+def find(items, name):
+    return next(item for item in items if item['name'] == name)
+
+
+class Test21CollectionParsing:
+
+    def test_01_expected_status_and_captures(self):
+        items, variables = load_collection(COLLECTION_PATH)
+        token = find(items, 'get_tokens/get_token_for_regular_user')
+        assert token['expected'] == 200 and token['captures'] == {
+            'userToken': 'token'
+        }, (
+            'Проверьте, что из скриптов коллекции берутся ожидаемый статус '
+            'и переменные, сохраняемые из ответа.'
+        )
+        assert variables['userUsername'] == 'regular-user'
+        bad_request = find(
+            items, 'registration_bad_requests/username_in_use'
+        )
+        assert not is_error(bad_request, 400) and is_error(bad_request, 200), (
+            'Проверьте, что ожидаемый в коллекции ответ 400 не считается '
+            'ошибкой.'
+        )
+
+    def test_02_folder_auth_inherited(self):
+        items, _ = load_collection(COLLECTION_PATH)
+        item = find(
+            items,
+            'titles_bad_requests/create_title_bad_requests/'
+            'create_title_without_name // Admin'
+        )
+        assert item['token'] == '{{adminToken}}', (
+            'Проверьте, что запрос без своей авторизации наследует её от '
+            'папки.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21LoadReplay:
+
+    def test_01_replay_reports_requests(self, live_server, tmp_path):
+        collection = tmp_path / 'collection.json'
+        collection.write_text(json.dumps({'item': [{
+            'name': 'titles',
+            'item': [{'name': 'get_titles', 'item': [{
+                'name': 'get_titles_list // No Auth',
+                'request': {
+                    'method': 'GET',
+                    'url': {'raw': 'http://127.0.0.1:8000/api/v1/titles/'},
+                },
+                'event': [{'listen': 'test', 'script': {'exec': [
+                    'pm.expect(pm.response.status, "").to.be.eql("OK");'
+                ]}}],
+            }]}],
+        }]}), encoding='utf-8')
+        output = StringIO()
+        call_command(
+            'replay_load', url=live_server.url, collection=str(collection),
+            concurrency=2, requests=10, weight=[('titles/get_titles', 1)],
+            stdout=output,
+        )
+        output = output.getvalue()
+        assert 'get_titles/get_titles_list // No Auth' in output, (
+            'Проверьте, что `replay_load` выводит статистику по каждому '
+            'запросу коллекции.'
+        )
+        assert 'всего 10 запросов' in output and 'ошибок 0.0%' in output, (
+            'Проверьте, что `replay_load` ограничивает число запросов '
+            'параметром --requests и считает долю ошибок.'
+        )
@@ -0,0 +1,121 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import caching
+from reviews.models import Comment, Review
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Counters:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/'
+    )
+
+    def get_counts(self, client, title_id, review_id):
+        title = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        ).json()
+        review = client.get(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )).json()
+        return title['reviews_count'], review['comments_count']
+
+    def test_01_counters_follow_changes(self, client, admin_client, admin,
+                                        user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        assert self.get_counts(client, title_id, review_id) == (2, 2), (
+            'Проверьте, что ответы API для произведения и отзыва содержат '
+            'поля `reviews_count` и `comments_count` с числом отзывов и '
+            'комментариев.'
+        )
+        response = admin_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id,
+            comment_id=comments[0]['id']
+        ))
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_counts(client, title_id, review_id) == (2, 1), (
+            'Проверьте, что `comments_count` уменьшается при удалении '
+            'комментария.'
+        )
+        user.delete()
+        assert self.get_counts(client, title_id, review_id) == (1, 0), (
+            'Проверьте, что счётчики учитывают каскадное удаление отзывов и '
+            'комментариев вместе с пользователем.'
+        )
+
+    def test_02_reviews_list_not_stale(self, client, admin_client, admin,
+                                       user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        assert response.json()['results'][0]['comments_count'] == 1
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'Ещё один'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.OK and (
+            response.json()['results'][0]['comments_count'] == 2
+        ), (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов и '
+            'ответ содержит актуальный `comments_count`.'
+        )
+
+    def test_03_deferred_fields_and_bulk_delete(self, admin_client, admin,
+                                                user_client, user):
+        comments, reviews, _ = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        review = Review.objects.get(pk=reviews[0]['id'])
+        comment = Comment.objects.only('id', 'text').get(
+            pk=comments[0]['id']
+        )
+        comment.text = 'Изменён'
+        comment.save()
+        review.refresh_from_db()
+        assert review.comments_count == 2, (
+            'Проверьте, что сохранение комментария с отложенными полями не '
+            'меняет `comments_count`.'
+        )
+        Comment.objects.defer('review').get(pk=comments[0]['id']).delete()
+        review.refresh_from_db()
+        assert review.comments_count == 1
+        Comment.objects.filter(review=review).delete()
+        review.refresh_from_db()
+        assert review.comments_count == 0, (
+            'Проверьте, что массовое удаление комментариев уменьшает '
+            '`comments_count`.'
+        )
+
+    def test_04_comment_bumps_only_its_title(self, admin_client, admin,
+                                             user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        versions = caching.get_versions(
+            f'reviews:{titles[0]["id"]}', f'reviews:{titles[1]["id"]}'
+        )
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'Ещё один'
+        )
+        new_versions = caching.get_versions(
+            f'reviews:{titles[0]["id"]}', f'reviews:{titles[1]["id"]}'
+        )
+        assert new_versions[0] != versions[0] and (
+            new_versions[1] == versions[1]
+        ), (
+            'Проверьте, что комментарий меняет версию списка отзывов только '
+            'своего произведения.'
+        )
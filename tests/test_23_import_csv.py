@@ -0,0 +1,236 @@
+import csv
+import gzip
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api import caching
+from reviews.management import csv_files
+from reviews.management.commands import import_csv
+from reviews.models import Comment, Review, Title
+
+DATA = {
+    'category': (
+        ('id', 'name', 'slug'),
+        (1, 'Фильм', 'movie'),
+    ),
+    'genre': (
+        ('id', 'name', 'slug'),
+        (1, 'Драма', 'drama'),
+    ),
+    'titles': (
+        ('id', 'name', 'year', 'category'),
+        (1, 'Побег из Шоушенка', 1994, 1),
+        (2, 'Крестный отец', 1972, 1),
+    ),
+    'genre_title': (
+        ('id', 'title_id', 'genre_id'),
+        (1, 1, 1),
+        (2, 2, 1),
+    ),
+    'users': (
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        (100, 'bingobongo', 'bingobongo@yamdb.fake', 'user', '', '', ''),
+        (101, 'capt_obvious', 'capt_obvious@yamdb.fake', 'admin', '', '', ''),
+    ),
+    'review': (
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Десять звёзд', 100, 10, '2019-09-24T21:08:21.567Z'),
+        (2, 1, 'Неплохо', 101, 6, '2019-09-24T21:08:21.567Z'),
+        (3, 2, 'Классика', 100, 9, '2019-09-24T21:08:21.567Z'),
+    ),
+    'comments': (
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 101, '2020-01-13T23:20:02.422Z'),
+    ),
+}
+
+
+def write_csv(path, file_name, rows, compress=False):
+    if compress:
+        csv_file = gzip.open(
+            path / f'{file_name}.csv.gz', 'wt', encoding='utf-8', newline=''
+        )
+    else:
+        csv_file = open(
+            path / f'{file_name}.csv', 'w', encoding='utf-8', newline=''
+        )
+    with csv_file:
+        csv.writer(csv_file).writerows(rows)
+
+
+@pytest.fixture
+def files_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(import_csv, 'FILES_PATH', str(tmp_path))
+    return tmp_path
+
+
+def read_rows(file_name):
+    csv_path = csv_files.find_csv(import_csv.FILES_PATH, file_name)
+    with csv_files.open_csv(csv_path) as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def run_import(**options):
+    stdout = StringIO()
+    call_command('import_csv', stdout=stdout, stderr=stdout, **options)
+    return stdout.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ImportCsv:
+
+    def test_01_stream_gzip(self, files_path):
+        for file_name, rows in DATA.items():
+            write_csv(files_path, file_name, rows, compress=True)
+        run_import(stream=True, chunk_size=2)
+        assert set(Review.objects.values_list('id', 'title_id', 'score')) == {
+            (1, 1, 10), (2, 1, 6), (3, 2, 9)
+        }, (
+            'Проверьте, что `import_csv --stream` загружает сжатые файлы '
+            '`.csv.gz` пачками.'
+        )
+        assert Title.objects.get(pk=1).rating == 8
+        assert Review.objects.get(pk=1).comments_count == 1
+
+    def test_02_stream_missing_foreign_key(self, files_path, capsys):
+        for file_name, rows in DATA.items():
+            write_csv(files_path, file_name, rows, compress=True)
+        write_csv(files_path, 'review', DATA['review'] + (
+            (4, 999, 'Нет такого', 100, 5, '2019-09-24T21:08:21.567Z'),
+        ), compress=True)
+        run_import(stream=True, chunk_size=2)
+        assert 'Не найдена запись title с id=999' in capsys.readouterr().out, (
+            'Проверьте, что в потоковом режиме отзыв на несуществующее '
+            'произведение приводит к сообщению об ошибке.'
+        )
+        assert set(Review.objects.values_list('id', flat=True)) == {1, 2}, (
+            'Проверьте, что пачка с ошибкой внешнего ключа не записывается, '
+            'а предыдущие пачки остаются в БД.'
+        )
+
+    def test_03_import_order(self, files_path):
+        for file_name, rows in DATA.items():
+            write_csv(files_path, file_name, rows)
+        order = import_csv.import_order({
+            file_name: csv_files.read_header(csv_path)
+            for file_name, csv_path in import_csv.find_files(
+                import_csv.IMPORT_MODELS
+            ).items()
+        })
+        for parent, child in (
+            ('category', 'titles'), ('titles', 'genre_title'),
+            ('genre', 'genre_title'), ('titles', 'review'),
+            ('users', 'review'), ('review', 'comments'),
+            ('users', 'comments'),
+        ):
+            assert order.index(parent) < order.index(child), (
+                f'Проверьте, что таблица {parent} загружается раньше '
+                f'ссылающейся на неё таблицы {child}.'
+            )
+
+    def test_04_parallel_missing_reference(self, files_path, capsys):
+        for file_name, rows in DATA.items():
+            write_csv(files_path, file_name, rows)
+        write_csv(files_path, 'comments', DATA['comments'] + (
+            (2, 77, 'К чему это?', 100, '2020-01-13T23:20:02.422Z'),
+        ))
+        output = run_import(workers=2, chunk_size=1)
+        assert 'Не найдена запись review с id=77' in capsys.readouterr().out, (
+            'Проверьте, что комментарий к несуществующему отзыву приводит к '
+            'сообщению об ошибке и при параллельном разборе.'
+        )
+        assert 'comments: разобрано 2 строк' in output
+        assert Review.objects.count() == 3
+        assert set(Comment.objects.values_list('id', flat=True)) == {1}
+
+    def test_05_upsert_twice(self, files_path, client):
+        for file_name, rows in DATA.items():
+            write_csv(files_path, file_name, rows)
+        output = run_import(upsert=True)
+        assert 'review: создано 3, обновлено 0, без изменений 0' in output
+        assert Title.objects.get(pk=1).rating == 8
+
+        versions = caching.get_versions('titles', 'reviews', 'categories')
+        etag = client.get('/api/v1/titles/1/reviews/')['ETag']
+        write_csv(files_path, 'review', DATA['review'][:2] + (
+            (2, 1, 'Неплохо', 101, 2, '2019-09-24T21:08:21.567Z'),
+        ) + DATA['review'][3:])
+        output = run_import(upsert=True)
+        for report in (
+            'review: создано 0, обновлено 1, без изменений 2',
+            'titles: создано 0, обновлено 0, без изменений 2',
+            'comments: создано 0, обновлено 0, без изменений 1',
+        ):
+            assert report in output, (
+                'Проверьте, что повторный `import_csv --upsert` обновляет '
+                'только изменённые записи.'
+            )
+        assert Title.objects.get(pk=1).rating == 6, (
+            'Проверьте, что изменённая при upsert оценка пересчитывает '
+            'рейтинг произведения.'
+        )
+        new_versions = caching.get_versions(
+            'titles', 'reviews', 'categories'
+        )
+        assert new_versions[:2] != versions[:2], (
+            'Проверьте, что после импорта версии кэша изменённых ресурсов '
+            'меняются.'
+        )
+        assert new_versions[2] == versions[2]
+        response = client.get(
+            '/api/v1/titles/1/reviews/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что после импорта отзывов ETag списка отзывов '
+            'меняется.'
+        )
+
+    def test_06_every_table_matches_csv(self):
+        run_import()
+        for file_name, model_class in import_csv.IMPORT_MODELS.items():
+            rows = read_rows(file_name)
+            columns = [
+                column for column in rows[0] if column != 'pub_date'
+            ]
+            fields = [
+                f'{import_csv.FIELD_MAPPING[column][0]}_id'
+                if column in import_csv.FIELD_MAPPING else column
+                for column in columns
+            ]
+            expected = {
+                tuple(row[column] for column in columns) for row in rows
+            }
+            loaded = {
+                tuple('' if value is None else str(value) for value in values)
+                for values in model_class.objects.values_list(*fields)
+            }
+            assert loaded == expected, (
+                f'Проверьте, что `import_csv` загружает все строки файла '
+                f'{file_name}.csv без изменений.'
+            )
+        genre_ids = {
+            int(row['genre_id']) for row in read_rows('genre_title')
+            if row['title_id'] == '1'
+        }
+        title = Title.objects.get(pk=1)
+        assert set(title.genre.values_list('pk', flat=True)) == genre_ids, (
+            'Проверьте, что связи из genre_title.csv доступны через '
+            '`Title.genre`.'
+        )
+
+    def test_07_parallel_malformed_row(self, files_path, capsys):
+        for file_name, rows in DATA.items():
+            write_csv(files_path, file_name, rows)
+        write_csv(files_path, 'titles', DATA['titles'] + ((3, 'Без года'),))
+        run_import(workers=2, chunk_size=1)
+        assert 'строка 4: неверное число полей' in capsys.readouterr().out, (
+            'Проверьте, что строка с неверным числом полей, найденная при '
+            'разборе в дочернем процессе, приводит к сообщению об ошибке.'
+        )
+        assert set(Title.objects.values_list('id', flat=True)) == {1, 2}
+        assert Review.objects.count() == 3, (
+            'Проверьте, что ошибка разбора одного файла не мешает загрузке '
+            'остальных.'
+        )
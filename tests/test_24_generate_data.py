@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from api import caching
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+SIZES = dict(
+    categories=2, genres=4, titles=6, users=5, reviews=20, comments=30,
+)
+
+# Поля без текущего времени: они совпадают при одинаковом seed.
+SNAPSHOT_FIELDS = (
+    (Category, ('id', 'name', 'slug')),
+    (Genre, ('id', 'name', 'slug')),
+    (Title, (
+        'id', 'name', 'year', 'description', 'category', 'rating',
+    )),
+    (Title.genre.through, ('id', 'title', 'genre')),
+    (User, ('id', 'username', 'email', 'role')),
+    (Review, (
+        'id', 'title', 'author', 'score', 'text', 'comments_count',
+    )),
+    (Comment, ('id', 'review', 'author', 'text')),
+)
+
+
+def generate(seed):
+    call_command('generate_data', seed=seed, stdout=StringIO(), **SIZES)
+    return {
+        model_class: list(
+            model_class.objects.order_by('pk').values_list(*fields)
+        )
+        for model_class, fields in SNAPSHOT_FIELDS
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24GenerateData:
+
+    def test_01_same_seed_same_rows(self):
+        versions = caching.get_versions('titles', 'reviews')
+        first = generate(seed=7)
+        new_versions = caching.get_versions('titles', 'reviews')
+        assert all(new != old for new, old in zip(new_versions, versions)), (
+            'Проверьте, что `generate_data` меняет версии кэша API, в том '
+            'числе общую версию списков отзывов.'
+        )
+        call_command('flush', interactive=False)
+        second = generate(seed=7)
+        for model_class, _ in SNAPSHOT_FIELDS:
+            assert second[model_class] == first[model_class], (
+                'Проверьте, что `generate_data` с одинаковым `--seed` на '
+                f'пустой БД создаёт одинаковые записи {model_class.__name__}.'
+            )
+        call_command('flush', interactive=False)
+        assert generate(seed=8)[Review] != first[Review]
+
+    def test_02_one_review_per_user_and_title(self):
+        generate(seed=7)
+        assert Review.objects.count() == SIZES['reviews']
+        assert not Review.objects.values('title', 'author').annotate(
+            count=Count('pk')
+        ).filter(count__gt=1).exists(), (
+            'Проверьте, что `generate_data` создаёт не больше одного отзыва '
+            'пользователя на произведение.'
+        )
@@ -0,0 +1,42 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from api.management.commands.benchmark import BENCHMARKS
+
+SIZES = dict(titles=2, users=3, reviews=6, comments=30, repeat=1, warmup=0)
+
+
+def run_benchmark(baseline, **options):
+    call_command(
+        'benchmark', baseline=str(baseline), stdout=StringIO(),
+        **SIZES, **options,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Benchmark:
+
+    def test_01_baseline_and_regression(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        cache.set('foreign', 'value')
+        run_benchmark(baseline, save=True)
+        assert cache.get('foreign') == 'value', (
+            'Проверьте, что `benchmark` не очищает кэш работающего сервера.'
+        )
+        results = json.loads(baseline.read_text(encoding='utf-8'))
+        assert set(results) == {name for name, *_ in BENCHMARKS}, (
+            'Проверьте, что `benchmark --save` записывает базовую линию '
+            'для каждого эндпоинта.'
+        )
+
+        for result in results.values():
+            result['queries'] = 0
+        baseline.write_text(json.dumps(results), encoding='utf-8')
+        # Под pytest команда пишет в ту же БД в памяти.
+        call_command('flush', interactive=False)
+        with pytest.raises(CommandError, match='SQL-запросов'):
+            run_benchmark(baseline)